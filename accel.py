@@ -0,0 +1,24 @@
+"""
+Optional NumPy acceleration for Modern Flappy Bird
+NumPy is imported on first use instead of at startup, and every caller keeps
+a pure-Python fallback, so builds without NumPy (or with FLAPPY_NUMPY=0 set)
+run the same game.
+"""
+import os
+
+_numpy = None
+_checked = False
+
+
+def numpy():
+    # The numpy module, or None when it is unavailable or disabled
+    global _numpy, _checked
+    if not _checked:
+        if os.environ.get("FLAPPY_NUMPY", "1") != "0":
+            try:
+                import numpy as np
+                _numpy = np
+            except ImportError:
+                pass
+        _checked = True
+    return _numpy
@@ -0,0 +1,226 @@
+"""
+Vectorized multi-bird simulator for Modern Flappy Bird
+Advances thousands of independent games per NumPy step for bot evaluation
+and balance testing. Each game follows the same rules as simulation.py and,
+given the same seed and inputs, produces the same pipes and score.
+
+Run: python batch_sim.py --birds 10000 --difficulty normal
+"""
+import argparse
+import time
+
+import numpy as np
+
+from simulation import BIRD_X, BIRD_SIZE, PIPE_WIDTH, PIPE_SPACING, PIPE_MARGIN, DIFFICULTY_SETTINGS
+
+
+def _splitmix64(state):
+    # Vectorized twin of simulation.SplitMix64.next (uint64 arithmetic wraps)
+    state = state + np.uint64(0x9E3779B97F4A7C15)
+    z = state
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return state, z ^ (z >> np.uint64(31))
+
+
+class BatchSimulator:
+    def __init__(self, count, difficulty="normal", seeds=None, width=1280, height=720, params=None):
+        settings = dict(DIFFICULTY_SETTINGS[difficulty])
+        if params:
+            settings.update(params)
+
+        self.count = count
+        self.difficulty = difficulty
+        self.width = width
+        self.height = height
+        self.gravity = settings["gravity"]
+        self.jump_strength = settings["jump_strength"]
+        self.initial_speed = settings["initial_speed"]
+        self.speed_increment = settings["speed_increment"]
+        self.pipe_gap = settings["pipe_gap"]
+        self.score_multiplier = settings["score_multiplier"]
+
+        if seeds is None:
+            seeds = np.arange(count)
+        self.seeds = np.asarray(seeds, dtype=np.uint64)
+        self.rng_state = self.seeds.copy()
+
+        # Per-bird state
+        self.tick = 0
+        self.bird_y = np.full(count, height // 2, dtype=np.float64)
+        self.bird_velocity = np.zeros(count)
+        self.pipe_speed = np.full(count, float(self.initial_speed))
+        self.score = np.zeros(count, dtype=np.int64)
+        self.combo = np.zeros(count, dtype=np.int64)
+        self.coins = np.zeros(count, dtype=np.int64)
+        self.perfect_passes = np.zeros(count, dtype=np.int64)
+        self.near_misses = np.zeros(count, dtype=np.int64)
+        self.max_combo = np.zeros(count, dtype=np.int64)
+        self.pipes_passed = np.zeros(count, dtype=np.int64)
+        self.ticks = np.zeros(count, dtype=np.int64)
+        self.alive = np.ones(count, dtype=bool)
+
+        # Per-game pipe queues as ring buffers: pipes spawn and leave in order,
+        # so slot (newest + 1) % slots is always free when a new one is needed
+        self.slots = width // PIPE_SPACING + 3
+        shape = (count, self.slots)
+        self.pipe_x = np.zeros(shape)
+        self.pipe_height = np.zeros(shape, dtype=np.int64)
+        self.pipe_active = np.zeros(shape, dtype=bool)
+        self.pipe_passed = np.zeros(shape, dtype=bool)
+        self.newest = np.zeros(count, dtype=np.int64)
+        self._rows = np.arange(count)
+        self._spawn(self.alive, self.newest)
+
+    def _spawn(self, mask, slots):
+        rows = self._rows[mask]
+        slots = slots[mask]
+        state, value = _splitmix64(self.rng_state[rows])
+        self.rng_state[rows] = state
+        low = PIPE_MARGIN
+        span = np.uint64(int(self.height - self.pipe_gap - PIPE_MARGIN) - low)
+        self.pipe_x[rows, slots] = self.width
+        self.pipe_height[rows, slots] = low + (value % span).astype(np.int64)
+        self.pipe_active[rows, slots] = True
+        self.pipe_passed[rows, slots] = False
+        self.newest[rows] = slots
+
+    def next_pipe(self):
+        # Index of the nearest pipe ahead of (or overlapping) each bird
+        ahead = self.pipe_active & (self.pipe_x + PIPE_WIDTH > BIRD_X)
+        return np.argmin(np.where(ahead, self.pipe_x, np.inf), axis=1)
+
+    def step(self, jump):
+        # Advance every live game by one tick; jump is a bool array of inputs
+        alive = self.alive
+        if not alive.any():
+            return
+        self.tick += 1
+        self.ticks += alive
+        live = alive[:, None]
+
+        # Bird physics
+        self.bird_velocity = np.where(jump & alive, self.jump_strength, self.bird_velocity)
+        self.bird_velocity += self.gravity * alive
+        self.bird_y += self.bird_velocity * alive
+
+        # Scroll, cull and spawn pipes
+        self.pipe_x -= np.where(live & self.pipe_active, self.pipe_speed[:, None], 0.0)
+        self.pipe_active &= self.pipe_x > -PIPE_WIDTH
+        newest_x = self.pipe_x[self._rows, self.newest]
+        spawn = alive & (newest_x < self.width - PIPE_SPACING)
+        if spawn.any():
+            self._spawn(spawn, (self.newest + 1) % self.slots)
+
+        # Rectangle collision against every pipe (pygame.Rect truncation)
+        bird_top = np.trunc(self.bird_y)[:, None]
+        bird_bottom = bird_top + BIRD_SIZE
+        pipe_left = np.trunc(self.pipe_x)
+        overlap = live & self.pipe_active & (pipe_left < BIRD_X + BIRD_SIZE) & (BIRD_X < pipe_left + PIPE_WIDTH)
+        gap_top = self.pipe_height
+        hit = overlap & (((bird_bottom > 0) & (bird_top < gap_top)) | (bird_bottom > gap_top + self.pipe_gap))
+        # A single collision ends the game (simulation.MAX_COLLISIONS == 1)
+        crashed = hit.any(axis=1)
+
+        # Scoring: pipes are at least PIPE_SPACING apart, so a bird passes at
+        # most one pipe per tick
+        passing = live & self.pipe_active & ~self.pipe_passed & (self.pipe_x < BIRD_X)
+        self.pipe_passed |= passing
+        scored = passing.any(axis=1)
+        if scored.any():
+            self._score(scored, passing)
+
+        # Boundaries
+        crashed |= (self.bird_y < 0) | (self.bird_y > self.height)
+        self.alive = alive & ~crashed
+
+    def _score(self, scored, passing):
+        multiplier = self.score_multiplier
+        height = self.pipe_height[self._rows, np.argmax(passing, axis=1)]
+        deviation = np.abs(self.bird_y + BIRD_SIZE / 2 - (height + self.pipe_gap / 2))
+        perfect = scored & (deviation < 10)
+        near = scored & ~perfect & (deviation < 30)
+        streak = perfect | near
+
+        self.pipes_passed += scored
+        self.score += multiplier * (scored + 2 * perfect + near)
+        self.combo = np.where(streak, self.combo + 1, np.where(scored, 0, self.combo))
+        self.perfect_passes += perfect
+        self.near_misses += near
+        np.maximum(self.max_combo, self.combo, out=self.max_combo)
+        self.coins += np.where(scored, (1 + self.combo // 3) * multiplier, 0)
+
+        speed_up = scored & (self.score % 10 == 0)
+        self.pipe_speed += speed_up * self.speed_increment
+
+    def run(self, policy, max_ticks=10000):
+        # Step until every bird is dead or max_ticks is reached; policy(sim)
+        # returns the jump array for the tick
+        start = time.perf_counter()
+        while self.tick < max_ticks and self.alive.any():
+            self.step(policy(self))
+        elapsed = time.perf_counter() - start
+        bird_ticks = int(self.ticks.sum())
+        return {
+            'birds': self.count,
+            'ticks': self.tick,
+            'bird_ticks': bird_ticks,
+            'seconds': elapsed,
+            'bird_ticks_per_second': bird_ticks / elapsed if elapsed > 0 else 0.0
+        }
+
+
+def gap_policy(sim):
+    # Scripted bot: flap when falling below the centre of the next gap
+    height = sim.pipe_height[sim._rows, sim.next_pipe()]
+    target = height + sim.pipe_gap / 2 - 5
+    return (sim.bird_y > target) & (sim.bird_velocity > 0)
+
+
+def noisy_gap_policy(jitter=15.0, seed=0):
+    # Gap bot with imperfect aim: the target height wobbles every tick
+    rng = np.random.default_rng(seed)
+
+    def policy(sim):
+        height = sim.pipe_height[sim._rows, sim.next_pipe()]
+        target = height + sim.pipe_gap / 2 - 5 + rng.normal(0.0, jitter, sim.count)
+        return (sim.bird_y > target) & (sim.bird_velocity > 0)
+    return policy
+
+
+def random_policy(probability=0.08, seed=0):
+    rng = np.random.default_rng(seed)
+
+    def policy(sim):
+        return rng.random(sim.count) < probability
+    return policy
+
+
+# Policy factories by name: factory(seed) -> policy(sim)
+POLICIES = {
+    "gap": lambda seed: gap_policy,
+    "noisy": lambda seed: noisy_gap_policy(seed=seed),
+    "random": lambda seed: random_policy(seed=seed),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized multi-bird simulator")
+    parser.add_argument('--birds', type=int, default=10000)
+    parser.add_argument('--ticks', type=int, default=5000)
+    parser.add_argument('--difficulty', choices=sorted(DIFFICULTY_SETTINGS), default="normal")
+    parser.add_argument('--policy', choices=sorted(POLICIES), default="gap")
+    args = parser.parse_args()
+
+    sim = BatchSimulator(args.birds, args.difficulty)
+    policy = POLICIES[args.policy](0)
+    result = sim.run(policy, args.ticks)
+    print(f"{result['birds']} birds, {result['ticks']} ticks, {result['bird_ticks']} bird-ticks "
+          f"in {result['seconds']:.2f}s")
+    print(f"Throughput: {result['bird_ticks_per_second']:,.0f} bird-ticks/s")
+    print(f"Mean score: {sim.score.mean():.1f}  best: {sim.score.max()}  "
+          f"alive: {int(sim.alive.sum())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Rendering microbenchmarks for Modern Flappy Bird
+Runs headless on the SDL dummy video driver and times the hot drawing paths.
+Results (per-call mean, p50 and p99 in milliseconds) are written as JSON so
+before/after numbers for any change are one command away.
+
+Run: python bench_render.py --out bench_results.json [--compare old.json]
+"""
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import json
+import platform
+import random
+import time
+from datetime import datetime
+
+import pygame
+
+import main
+import simulation
+from main import Game, ParticleSystem, Utils, PRIMARY, ACCENT
+
+PARTICLE_COUNTS = (100, 1000, 10000)
+CHURN_LIFETIME = 30  # frames; short enough that particles die every update
+
+
+def measure(func, iterations, warmup=5):
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        func()
+        samples.append(time.perf_counter_ns() - start)
+    samples.sort()
+    count = len(samples)
+    return {
+        'calls': count,
+        'mean_ms': sum(samples) / count / 1e6,
+        'p50_ms': samples[count // 2] / 1e6,
+        'p99_ms': samples[min(count - 1, int(count * 0.99))] / 1e6,
+        'min_ms': samples[0] / 1e6
+    }
+
+
+def filled_particles(count):
+    particles = ParticleSystem(capacity=count)
+    rng = random.Random(count)
+    for _ in range(count):
+        particles.add_particle(
+            rng.uniform(0, main.SCREEN_WIDTH), rng.uniform(0, main.SCREEN_HEIGHT),
+            (*PRIMARY, 150),
+            (rng.uniform(-0.5, 0.5), rng.uniform(-0.5, 0.5)),
+            # Long lifetimes keep the count steady for the whole run
+            10 ** 6
+        )
+    return particles
+
+
+def churning_particles(count):
+    # A full pool of short-lived particles and a step that spawns twice as
+    # many as die, so every call compacts dead slots and recycles live ones
+    particles = ParticleSystem(capacity=count)
+    rng = random.Random(count)
+
+    def spawn(n):
+        for _ in range(n):
+            particles.add_particle(
+                rng.uniform(0, main.SCREEN_WIDTH), rng.uniform(0, main.SCREEN_HEIGHT),
+                (*PRIMARY, 150),
+                (rng.uniform(-0.5, 0.5), rng.uniform(-0.5, 0.5)),
+                rng.randint(1, CHURN_LIFETIME)
+            )
+    spawn(count)
+    per_step = max(1, 2 * count // CHURN_LIFETIME)
+
+    def step():
+        spawn(per_step)
+        particles.update()
+    return particles, step
+
+
+def run_benchmarks(game, iterations):
+    width, height = main.SCREEN_WIDTH, main.SCREEN_HEIGHT
+    screen = game.screen
+    results = {}
+
+    def bench(name, func, count=iterations):
+        results[name] = measure(func, count)
+        print(f"{name:<40} mean {results[name]['mean_ms']:8.3f} ms   "
+              f"p50 {results[name]['p50_ms']:8.3f}   p99 {results[name]['p99_ms']:8.3f}")
+
+    # Gradients: uncached build and the cached lookup draw_background uses
+    bench("utils.create_gradient_surface",
+          lambda: Utils.create_gradient_surface(width, height, PRIMARY, ACCENT))
+    bench("utils.get_gradient_surface",
+          lambda: Utils.get_gradient_surface(width, height, PRIMARY, ACCENT))
+    bench("utils.draw_rounded_rect",
+          lambda: Utils.draw_rounded_rect(screen, PRIMARY, (100, 100, 200, 50), 10))
+
+    style = game.settings.background_style
+    for background_style in ("dynamic", "static", "minimal"):
+        game.settings.background_style = background_style
+        bench(f"game.draw_background[{background_style}]", game.draw_background)
+
+    # The dynamic background at the lowest quality level
+    game.settings.background_style = "dynamic"
+    game.quality.level = len(game.quality.LEVELS) - 1
+    bench(f"game.draw_background[dynamic@{game.quality.name}]", game.draw_background)
+    game.quality.level = 0
+
+    # Presenting a minimal-style frame: full flip vs dirty-rect update
+    game.settings.background_style = "minimal"
+    enabled = game.dirty.enabled
+    for dirty in (False, True):
+        game.dirty.enabled = dirty
+
+        def present_frame():
+            game.draw_background()
+            game.dirty.present()
+        bench(f"present.minimal[{'dirty' if dirty else 'flip'}]", present_frame)
+    game.dirty.enabled = enabled
+    game.settings.background_style = style
+
+    bench("game.draw_bird", lambda: game.draw_bird(100, height // 2, 20))
+    bench("game.draw_bird[invincible]", lambda: game.draw_bird(100, height // 2, 20, 30))
+    bench("game.draw_bird[ghost]", lambda: game.draw_bird(100, height // 2, 20, alpha=main.GHOST_ALPHA))
+
+    for count in PARTICLE_COUNTS:
+        particles = filled_particles(count)
+        bench(f"particles.update[{count}]", particles.update)
+        bench(f"particles.draw[{count}]", lambda: particles.draw(screen))
+        churning, step = churning_particles(count)
+        bench(f"particles.churn[{count}]", step)
+        bench(f"particles.draw[{count}, churn]", lambda: churning.draw(screen))
+
+    # Gameplay layers for a mid-run state with a full set of pipes
+    state = simulation.GameState("normal", seed=1, width=width, height=height)
+    while len(state.pipes) < width // simulation.PIPE_SPACING + 1:
+        simulation.step(state, simulation.gap_policy(state))
+    state.score, state.combo = 60, 4
+    bench("game.draw_pipes", lambda: game.draw_pipes(state.pipes))
+
+    # World layers at full and half resolution, still and shaking
+    compositor = main.Compositor(width, height)
+    for scale, camera in ((1.0, (0, 0)), (0.5, (0, 0)), (1.0, (7, -5)), (0.5, (7, -5))):
+
+        def world_frame():
+            compositor.scale = scale
+            compositor.camera = camera
+            world = compositor.world(screen)
+            game.draw_background(world, scale)
+            game.draw_pipes(state.pipes, world, scale=scale)
+            compositor.compose(world, screen)
+        bench(f"world[{scale}{', shake' if camera != (0, 0) else ''}]", world_frame)
+
+    bench("game.draw_hud", lambda: game.draw_hud(state))
+
+    # Game-over overlay during the fade-in and once every stat is visible
+    for elapsed in (500, 4000):
+        bench(f"game.draw_game_over[{elapsed}ms]",
+              lambda: game.draw_game_over(state, pygame.time.get_ticks() - elapsed))
+    game.particles.clear()
+
+    return results
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+    print(f"\n{'benchmark':<40} {'before':>10} {'after':>10} {'change':>8}")
+    for name, result in results.items():
+        if name in baseline:
+            before = baseline[name]['mean_ms']
+            after = result['mean_ms']
+            change = (after - before) / before * 100 if before else 0.0
+            print(f"{name:<40} {before:10.3f} {after:10.3f} {change:+7.1f}%")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Rendering microbenchmarks")
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--out', default="bench_results.json")
+    parser.add_argument('--compare', help="previous results file to diff against")
+    args = parser.parse_args()
+
+    game = Game()
+    results = run_benchmarks(game, args.iterations)
+    report = {
+        'meta': {
+            'date': datetime.now().isoformat(timespec="seconds"),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'sdl': ".".join(map(str, pygame.get_sdl_version())),
+            'video_driver': pygame.display.get_driver(),
+            'resolution': [main.SCREEN_WIDTH, main.SCREEN_HEIGHT],
+            'iterations': args.iterations
+        },
+        'results': results
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.out}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -19,9 +19,11 @@ version = 1.0.0
 
 # (list) Application requirements
 # pygame_sdl2 is better for mobile, but if not available, use pygame
-# numpy==1.23.4 is used instead of 1.26.4 to avoid PyPI 404 errors
-# (1.26.4 source dist URL changed, 1.23.4 is stable for Android)
-requirements = python3==3.10.6,hostpython3==3.10.6,numpy==1.23.4,pygame==2.1.3,android
+# NumPy is optional (see accel.py): the game falls back to pure Python
+# without it, so it is no longer bundled. To bundle it anyway, add
+# numpy==1.23.4 (1.26.4's source dist URL returns 404 on PyPI)
+# sqlite3 backs the run history and leaderboard (run_history.py)
+requirements = python3==3.10.6,hostpython3==3.10.6,pygame==2.1.3,android,sqlite3
 
 # (str) Supported orientation (landscape, sensorLandscape, portrait or all)
 orientation = landscape
@@ -0,0 +1,137 @@
+"""
+Ghost tracks for Modern Flappy Bird
+A ghost is the bird's pose on every tick of a personal-best run: y in
+quarter pixels as int16 and angle in whole degrees as int8, stored with the
+run's seed and screen size so the ghost can be raced on the same pipes (pipe
+positions depend on both). One file per
+difficulty, written in fixed-size chunks so playback reads only the chunk
+around the current tick instead of loading the whole track.
+"""
+import os
+import struct
+import sys
+from array import array
+
+GHOST_DIR = "ghosts"
+MAGIC = b"FBGH"
+VERSION = 2
+CHUNK_TICKS = 1024  # 3 KB per chunk: CHUNK_TICKS y values then CHUNK_TICKS angles
+Y_SCALE = 4
+
+_HEADER = struct.Struct("<4sBQiIHH")  # magic, version, seed, score, ticks, width, height
+
+
+def path_for(difficulty, directory=GHOST_DIR):
+    return os.path.join(directory, f"{difficulty}.ghost")
+
+
+def _little_endian(values):
+    # Files are little-endian whatever the platform
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+class GhostRecorder:
+    # Call record(state) after every simulation.step
+    def __init__(self, state):
+        self.difficulty = state.difficulty
+        self.seed = state.seed
+        self.size = (state.width, state.height)
+        self.ys = array('h')
+        self.angles = array('b')
+
+    def record(self, state):
+        self.ys.append(max(-32768, min(32767, int(round(state.bird_y * Y_SCALE)))))
+        self.angles.append(int(state.angle))
+
+    def to_bytes(self, score):
+        out = bytearray(_HEADER.pack(MAGIC, VERSION, self.seed, score, len(self.ys), *self.size))
+        for start in range(0, len(self.ys), CHUNK_TICKS):
+            out += _little_endian(self.ys[start:start + CHUNK_TICKS]).tobytes()
+            out += self.angles[start:start + CHUNK_TICKS].tobytes()
+        return bytes(out)
+
+    def save(self, score, directory=GHOST_DIR):
+        return self.write(self.difficulty, self.to_bytes(score), directory)
+
+    @staticmethod
+    def write(difficulty, data, directory=GHOST_DIR):
+        # Store bytes from to_bytes() atomically, so a reader sees either the
+        # old track or the new one
+        path = path_for(difficulty, directory)
+        os.makedirs(directory, exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        return path
+
+
+class GhostTrack:
+    # A stored ghost opened for playback. Holds the file open and at most one
+    # decoded chunk in memory.
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            header = _HEADER.unpack(self._file.read(_HEADER.size))
+            magic, version, self.seed, self.score, self.ticks, *size = header
+            self.size = tuple(size)
+        except struct.error:
+            magic = version = None
+        if magic != MAGIC or version != VERSION:
+            self._file.close()
+            raise ValueError("Not a ghost file or unsupported version")
+        self._chunk = -1
+        self._ys = array('h')
+        self._angles = array('b')
+
+    @classmethod
+    def open(cls, difficulty, size, directory=GHOST_DIR):
+        # The stored ghost for a difficulty, or None if there is no usable one.
+        # A ghost from another screen size flew a different course.
+        try:
+            track = cls(path_for(difficulty, directory))
+        except (OSError, ValueError):
+            return None
+        if track.size != tuple(size):
+            track.close()
+            return None
+        return track
+
+    @staticmethod
+    def best_score(difficulty, size, directory=GHOST_DIR):
+        # Score of the stored ghost from its header alone, or None if there
+        # is no ghost that can be raced at this screen size
+        try:
+            with open(path_for(difficulty, directory), 'rb') as f:
+                magic, version, _, score, _, *stored_size = _HEADER.unpack(f.read(_HEADER.size))
+        except (OSError, struct.error):
+            return None
+        if magic != MAGIC or version != VERSION or tuple(stored_size) != tuple(size):
+            return None
+        return score
+
+    def _load(self, chunk):
+        start = chunk * CHUNK_TICKS
+        count = min(CHUNK_TICKS, self.ticks - start)
+        self._file.seek(_HEADER.size + start * 3)
+        data = self._file.read(count * 3)
+        self._ys = _little_endian(array('h', data[:count * 2]))
+        self._angles = array('b', data[count * 2:])
+        self._chunk = chunk
+
+    def pose(self, tick):
+        # (y, angle) after `tick` steps; None before the first step and once
+        # the ghost's run is over
+        index = tick - 1
+        if index < 0 or index >= self.ticks:
+            return None
+        chunk, offset = divmod(index, CHUNK_TICKS)
+        if chunk != self._chunk:
+            self._load(chunk)
+        return self._ys[offset] / Y_SCALE, self._angles[offset]
+
+    def close(self):
+        self._file.close()
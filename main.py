@@ -1,13 +1,31 @@
 
+import time
+STARTUP_TIME = time.perf_counter()  # start of the startup report
+
+import asyncio
 import pygame
-import numpy as np
 import sys
 import os
 import json
+import logging
 import random
 from pygame import mixer, gfxdraw
 import math
+import threading
+import atexit
+from array import array
 from datetime import datetime
+from collections import OrderedDict, deque
+
+import accel
+import simulation
+import sounds
+from simulation import DIFFICULTY_SETTINGS
+from ghost import GhostRecorder, GhostTrack
+from replay import Replay, ReplayRecorder
+from run_history import RunHistory
+
+logger = logging.getLogger(__name__)
 
 # Initialize Pygame
 pygame.init()
@@ -18,6 +36,7 @@ mixer.init()
 import platform
 PLATFORM = platform.system()
 IS_MOBILE = os.environ.get('ANDROID_ARGUMENT', '') or os.environ.get('PYGAME_BLEND_ALPHA_SDL2', '')
+IS_WEB = sys.platform == "emscripten"  # pygbag: no threads, browser paces frames
 
 # Screen size - responsive for different devices
 if IS_MOBILE:
@@ -29,6 +48,7 @@ else:
     SCREEN_WIDTH = 1280
     SCREEN_HEIGHT = 720
 FPS = 60
+GHOST_ALPHA = 90  # opacity of the best-run ghost bird
 
 # Colors
 WHITE = (255, 255, 255)
@@ -43,47 +63,84 @@ SILVER = (192, 192, 192)
 CRYSTAL = (173, 216, 230)
 NEON_PINK = (255, 110, 199)
 
-# Difficulty Settings
-DIFFICULTY_SETTINGS = {
-    "easy": {
-        "gravity": 0.35,
-        "jump_strength": -7,
-        "initial_speed": 2.5,
-        "speed_increment": 0.3,
-        "pipe_gap": 220,
-        "score_multiplier": 1
-    },
-    "normal": {
-        "gravity": 0.5,
-        "jump_strength": -8,
-        "initial_speed": 3.5,
-        "speed_increment": 0.5,
-        "pipe_gap": 200,
-        "score_multiplier": 2
-    },
-    "hardcore": {
-        "gravity": 0.65,
-        "jump_strength": -9,
-        "initial_speed": 4.5,
-        "speed_increment": 0.7,
-        "pipe_gap": 180,
-        "score_multiplier": 3
-    }
+# Shop catalogue
+BIRD_SKINS = {
+    "default": {"price": 0, "color": (255, 200, 31)},
+    "golden": {"price": 100, "color": (255, 215, 0)},
+    "rainbow": {"price": 500, "color": (255, 100, 100)},
+    "robot": {"price": 999, "color": (192, 192, 192)}
+}
+
+OBSTACLE_STYLES = {
+    "default": {"price": 0, "color": PRIMARY},
+    "crystal": {"price": 150, "color": (173, 216, 230)},
+    "neon": {"price": 300, "color": (255, 110, 199)},
+    "gold": {"price": 750, "color": (255, 215, 0)}
+}
+
+# Game attribute -> sounds.RECIPES entry
+SOUND_EFFECTS = {
+    "jump_sound": "jump",
+    "point_sound": "point",
+    "death_sound": "death",
+    "ui_click": "ui_click"
 }
 
 class Utils:
+    # Recently used gradient surfaces, keyed by quantized colors and size
+    _gradient_cache = OrderedDict()
+    GRADIENT_CACHE_SIZE = 8
+    GRADIENT_COLOR_STEP = 4
+
+    @staticmethod
+    def start_thread(target, *args):
+        # Background daemon thread, or None where threads are unavailable
+        # (the browser build); callers then do the work inline or skip it
+        if IS_WEB:
+            return None
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        return thread
+
     @staticmethod
     def create_gradient_surface(width, height, start_color, end_color, vertical=True):
-        surface = pygame.Surface((width, height))
-        for i in range(height if vertical else width):
-            factor = i / (height if vertical else width)
-            color = tuple(np.array(start_color) * (1 - factor) + np.array(end_color) * factor)
-            if vertical:
-                pygame.draw.line(surface, color, (0, i), (width, i))
-            else:
-                pygame.draw.line(surface, color, (i, 0), (i, height))
+        # Build the gradient as a 1-pixel RGB strip, then stretch it
+        length = height if vertical else width
+        factors = [i / length for i in range(length)]
+        pixels = bytearray(length * 3)
+        for channel in range(3):
+            start, end = start_color[channel], end_color[channel]
+            pixels[channel::3] = bytes([int(start * (1 - f) + end * f) for f in factors])
+        strip = pygame.image.frombuffer(pixels, (1, length) if vertical else (length, 1), "RGB")
+        surface = pygame.transform.scale(strip, (width, height))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
         return surface
 
+    @staticmethod
+    def get_gradient_surface(width, height, start_color, end_color, vertical=True):
+        # Cached variant for animated backgrounds: colors are quantized so slowly
+        # drifting gradients reuse the same surface for several frames
+        step = Utils.GRADIENT_COLOR_STEP
+        start = tuple(int(c) // step * step for c in start_color[:3])
+        end = tuple(int(c) // step * step for c in end_color[:3])
+        key = (width, height, start, end, vertical)
+        cache = Utils._gradient_cache
+        surface = cache.get(key)
+        if surface is None:
+            surface = Utils.create_gradient_surface(width, height, start, end, vertical)
+            cache[key] = surface
+            if len(cache) > Utils.GRADIENT_CACHE_SIZE:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        return surface
+
+    @staticmethod
+    def quantize(value, steps=40):
+        # Snap an animation factor to a few levels so cached text renders are reused
+        return round(value * steps) / steps
+
     @staticmethod
     def draw_rounded_rect(surface, color, rect, radius):
         x, y, width, height = map(int, rect)  # Convert to integers
@@ -106,33 +163,237 @@ class Utils:
             pygame.gfxdraw.aacircle(surface, circle_x, circle_y, radius, color)
             pygame.gfxdraw.filled_circle(surface, circle_x, circle_y, radius, color)
 
+class TextCache:
+    # Shared text service: Font objects pooled by size plus an LRU of rendered
+    # surfaces, so unchanged HUD and menu text costs only a blit. Returned
+    # surfaces are shared and must not be modified by callers.
+    def __init__(self, max_bytes=4 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._fonts = {}
+        self._surfaces = OrderedDict()
+
+    def font(self, size):
+        font = self._fonts.get(size)
+        if font is None:
+            font = self._fonts[size] = pygame.font.Font(None, size)
+        return font
+
+    def render(self, text, antialias, color, size=36):
+        # Same argument order as Font.render, plus the font size
+        color = tuple(int(c) for c in color)
+        key = (text, size, color, antialias)
+        surfaces = self._surfaces
+        surface = surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.font(size).render(text, antialias, color)
+        surfaces[key] = surface
+        self.bytes += surface.get_width() * surface.get_height() * surface.get_bytesize()
+        while self.bytes > self.max_bytes and len(surfaces) > 1:
+            _, old = surfaces.popitem(last=False)
+            self.bytes -= old.get_width() * old.get_height() * old.get_bytesize()
+        return surface
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': len(self._surfaces),
+            'bytes': self.bytes,
+            'fonts': len(self._fonts)
+        }
+
+
+text_cache = TextCache()
+
 class ParticleSystem:
-    def __init__(self):
-        self.particles = []
+    # Struct-of-arrays particle store: live particles are packed into the first
+    # `count` slots, so update and draw work on contiguous slices. Storage is
+    # array-module buffers; once NumPy is loaded, larger batches go through
+    # NumPy views of the same buffers and smaller ones stay in plain Python.
+    ALPHA_BUCKETS = 16
+    MAX_SIZE = 15  # radius must fit the 4 size bits of a stamp key
+    STAMP_CACHE_SIZE = 256
+    VECTOR_THRESHOLD = 64  # live particles before NumPy pays for its overhead
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.limit = capacity  # live particles allowed, lowered by the quality governor
+        self.count = 0
+        self.positions = array('d', bytes(16 * capacity))      # x, y pairs
+        self.velocities = array('d', bytes(16 * capacity))
+        self.lifetimes = array('i', bytes(4 * capacity))
+        self.max_lifetimes = array('i', [1]) * capacity
+        # RGB only: alpha comes from the remaining lifetime, as it always has
+        self.colors = array('B', bytes(3 * capacity))
+        self.sizes = array('i', [2]) * capacity
+        self._views = None
+        self._recycle_index = 0
+        # Pre-rendered alpha circles keyed by packed (color, alpha bucket, size)
+        self._stamps = {}
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+        self._recycle_index = 0
+
+    def set_limit(self, limit):
+        # Particles already above the new limit live out their lifetimes
+        self.limit = max(1, min(limit, self.capacity))
+        self._recycle_index %= self.limit
+
+    def add_particle(self, x, y, color, velocity=(0, 0), lifetime=30, size=2):
+        if self.count < self.limit:
+            i = self.count
+            self.count += 1
+        else:
+            # At the limit: recycle slots in ring order instead of growing
+            i = self._recycle_index
+            self._recycle_index = (i + 1) % self.limit
+        self.positions[2 * i] = x
+        self.positions[2 * i + 1] = y
+        self.velocities[2 * i], self.velocities[2 * i + 1] = velocity
+        self.lifetimes[i] = lifetime
+        self.max_lifetimes[i] = max(1, lifetime)
+        self.colors[3 * i:3 * i + 3] = array('B', (int(color[0]), int(color[1]), int(color[2])))
+        self.sizes[i] = max(1, min(int(size), self.MAX_SIZE))
 
-    def add_particle(self, x, y, color, velocity=(0, 0), lifetime=30):
-        self.particles.append({
-            'pos': [x, y],
-            'velocity': velocity,
-            'color': color,
-            'lifetime': lifetime,
-            'max_lifetime': lifetime
-        })
+    def _vectorized(self):
+        # NumPy views over the storage buffers, or None to stay in Python
+        if self.count < self.VECTOR_THRESHOLD:
+            return None
+        if self._views is None:
+            np = accel.numpy()
+            if np is None:
+                return None
+            capacity = self.capacity
+            self._views = (
+                np,
+                np.frombuffer(self.positions, dtype=np.float64).reshape(capacity, 2),
+                np.frombuffer(self.velocities, dtype=np.float64).reshape(capacity, 2),
+                np.frombuffer(self.lifetimes, dtype=np.intc),
+                np.frombuffer(self.max_lifetimes, dtype=np.intc),
+                np.frombuffer(self.colors, dtype=np.uint8).reshape(capacity, 3),
+                np.frombuffer(self.sizes, dtype=np.intc)
+            )
+        return self._views
 
     def update(self):
-        for particle in self.particles[:]:
-            particle['pos'][0] += particle['velocity'][0]
-            particle['pos'][1] += particle['velocity'][1]
-            particle['lifetime'] -= 1
-            if particle['lifetime'] <= 0:
-                self.particles.remove(particle)
+        n = self.count
+        if n == 0:
+            return
+        views = self._vectorized()
+        if views is None:
+            self._update_python(n)
+            return
+        np, positions, velocities, lifetimes, max_lifetimes, colors, sizes = views
+        positions[:n] += velocities[:n]
+        lifetimes[:n] -= 1
+        alive = lifetimes[:n] > 0
+        if not alive.all():
+            # Compact survivors to the front in one pass per array
+            keep = np.flatnonzero(alive)
+            m = len(keep)
+            for column in (positions, velocities, lifetimes, max_lifetimes, colors, sizes):
+                column[:m] = column[keep]
+            self.count = m
+            self._recycle_index = 0
 
-    def draw(self, surface):
-        for particle in self.particles:
-            alpha = int(255 * (particle['lifetime'] / particle['max_lifetime']))
-            color = (*particle['color'][:3], alpha)
-            pos = tuple(map(int, particle['pos']))
-            pygame.draw.circle(surface, color, pos, 2)
+    def _update_python(self, n):
+        positions, velocities = self.positions, self.velocities
+        lifetimes, max_lifetimes = self.lifetimes, self.max_lifetimes
+        colors, sizes = self.colors, self.sizes
+        m = 0
+        for i in range(n):
+            lifetime = lifetimes[i] - 1
+            if lifetime <= 0:
+                continue
+            j, k = 2 * i, 2 * m
+            positions[k] = positions[j] + velocities[j]
+            positions[k + 1] = positions[j + 1] + velocities[j + 1]
+            lifetimes[m] = lifetime
+            if m != i:
+                velocities[k] = velocities[j]
+                velocities[k + 1] = velocities[j + 1]
+                max_lifetimes[m] = max_lifetimes[i]
+                colors[3 * m:3 * m + 3] = colors[3 * i:3 * i + 3]
+                sizes[m] = sizes[i]
+            m += 1
+        if m != n:
+            self.count = m
+            self._recycle_index = 0
+
+    def _make_stamp(self, key):
+        packed, size = divmod(key, 16)
+        rgb, bucket = divmod(packed, self.ALPHA_BUCKETS)
+        color = ((rgb >> 16) & 255, (rgb >> 8) & 255, rgb & 255,
+                 bucket * 255 // (self.ALPHA_BUCKETS - 1))
+        stamp = pygame.Surface((size * 2 + 1, size * 2 + 1), pygame.SRCALPHA)
+        pygame.draw.circle(stamp, color, (size, size), size)
+        if pygame.display.get_surface() is not None:
+            stamp = stamp.convert_alpha()
+        if len(self._stamps) >= self.STAMP_CACHE_SIZE:
+            del self._stamps[next(iter(self._stamps))]
+        self._stamps[key] = stamp
+        return stamp
+
+    def _stamp_keys(self, n, scale=1.0):
+        # Stamp key and top-left blit position for every live particle
+        buckets = self.ALPHA_BUCKETS
+        views = self._vectorized()
+        if views is not None:
+            np, positions, _, lifetimes, max_lifetimes, colors, sizes = views
+            bucket = np.minimum(lifetimes[:n] * buckets // max_lifetimes[:n], buckets - 1)
+            colors = colors[:n].astype(np.int64)
+            rgb = (colors[:, 0] << 16) | (colors[:, 1] << 8) | colors[:, 2]
+            sizes = sizes[:n]
+            if scale != 1.0:
+                sizes = np.maximum(1, (sizes * scale).astype(np.intc))
+                positions = positions[:n] * scale
+            keys = ((rgb * buckets + bucket) * 16 + sizes).tolist()
+            return keys, (positions[:n] - sizes[:, None]).astype(int).tolist()
+
+        positions, lifetimes, max_lifetimes = self.positions, self.lifetimes, self.max_lifetimes
+        colors, sizes = self.colors, self.sizes
+        keys = []
+        points = []
+        for i in range(n):
+            size = sizes[i] if scale == 1.0 else max(1, int(sizes[i] * scale))
+            bucket = min(lifetimes[i] * buckets // max_lifetimes[i], buckets - 1)
+            rgb = (colors[3 * i] << 16) | (colors[3 * i + 1] << 8) | colors[3 * i + 2]
+            keys.append((rgb * buckets + bucket) * 16 + size)
+            points.append((int(positions[2 * i] * scale - size), int(positions[2 * i + 1] * scale - size)))
+        return keys, points
+
+    def draw(self, surface, dirty=None, scale=1.0):
+        n = self.count
+        if n == 0:
+            return
+        # Map every particle to a stamp key, then submit the whole frame as a
+        # single blits() batch
+        keys, positions = self._stamp_keys(n, scale)
+        stamps = self._stamps
+        batch = []
+        for key, pos in zip(keys, positions):
+            stamp = stamps.get(key)
+            if stamp is None:
+                stamp = self._make_stamp(key)
+            batch.append((stamp, pos))
+        if dirty is not None and dirty.enabled:
+            dirty.extend(surface.blits(batch))
+        else:
+            surface.blits(batch, doreturn=False)
 
 class Button:
     def __init__(self, x, y, width, height, text, color=PRIMARY, hover_color=SECONDARY):
@@ -141,7 +402,6 @@ class Button:
         self.color = color
         self.hover_color = hover_color
         self.current_color = color
-        self.font = pygame.font.Font(None, 36)
         self.hover = False
         self.animation_progress = 0
 
@@ -149,14 +409,16 @@ class Button:
         self.hover = self.rect.collidepoint(mouse_pos)
         target = 1 if self.hover else 0
         self.animation_progress += (target - self.animation_progress) * 0.2
-        self.current_color = tuple(np.array(self.color) * (1 - self.animation_progress) + 
-                                 np.array(self.hover_color) * self.animation_progress)
+        progress = self.animation_progress
+        self.current_color = tuple(a * (1 - progress) + b * progress
+                                   for a, b in zip(self.color, self.hover_color))
 
     def draw(self, surface):
         Utils.draw_rounded_rect(surface, self.current_color, self.rect, 10)
-        text_surface = self.font.render(self.text, True, WHITE)
+        text_surface = text_cache.render(self.text, True, WHITE)
         text_rect = text_surface.get_rect(center=self.rect.center)
         surface.blit(text_surface, text_rect)
+        return self.rect
 
 class Slider:
     def __init__(self, x, y, width, height, min_value=0, max_value=1, value=0.5):
@@ -180,8 +442,619 @@ class Slider:
         pygame.draw.rect(surface, PRIMARY, self.rect, border_radius=5)
         pos = self.rect.x + self.value * self.rect.width
         pygame.draw.circle(surface, SECONDARY, (int(pos), self.rect.centery), 10)
+        # Area touched, including the knob overhanging either end
+        return self.rect.inflate(22, 0)
+
+class BirdSpriteCache:
+    # Pre-rendered bird frames keyed by skin, quantized angle, wing-bob phase
+    # and invincibility flash level, built lazily and kept in display format
+    ANGLE_STEP = 5      # degrees; the bird angle is clipped to -45..45
+    WING_PHASES = 8
+    FLASH_LEVELS = 4
+
+    def __init__(self):
+        self._sprites = {}
+
+    def __len__(self):
+        return len(self._sprites)
+
+    def get(self, skin, angle, wing_time, flash=None):
+        # wing_time is in wing-bob radians; flash is None or 0..1
+        angle_index = int(round(max(-45, min(45, angle)) / self.ANGLE_STEP))
+        phase = int(wing_time / (2 * math.pi) * self.WING_PHASES) % self.WING_PHASES
+        level = 0 if flash is None else 1 + int(round(flash * (self.FLASH_LEVELS - 1)))
+        key = (skin, angle_index, phase, level)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            sprite = self._render(*key)
+            self._sprites[key] = sprite
+        return sprite
+
+    def prebuild(self, skin):
+        for angle_index in range(-45 // self.ANGLE_STEP, 45 // self.ANGLE_STEP + 1):
+            for phase in range(self.WING_PHASES):
+                key = (skin, angle_index, phase, 0)
+                if key not in self._sprites:
+                    self._sprites[key] = self._render(*key)
+
+    def _render(self, skin, angle_index, phase, level):
+        # Draw a more stylized bird using shapes
+        bird_color = BIRD_SKINS.get(skin, BIRD_SKINS["default"])["color"]
+
+        # Create a surface for the bird with alpha channel
+        bird_surface = pygame.Surface((40, 40), pygame.SRCALPHA)
+
+        # If invincible, create flashing effect
+        if level:
+            flash_intensity = (level - 1) / (self.FLASH_LEVELS - 1)
+            bird_color = tuple(map(lambda x: int(x * 0.7 + 255 * 0.3 * flash_intensity), bird_color))
+
+        # Draw body with optional glow for invincibility
+        pygame.draw.ellipse(bird_surface, bird_color, (5, 5, 30, 20))
+        if level:
+            glow_color = (*GOLD, int(64 * flash_intensity))
+            pygame.draw.ellipse(bird_surface, glow_color, (3, 3, 34, 24), 2)
+
+        # Draw wing
+        wing_y = 15 + math.sin(2 * math.pi * phase / self.WING_PHASES) * 3
+        wing_color = tuple(map(lambda x: int(x * 0.9), bird_color))
+        pygame.draw.ellipse(bird_surface, wing_color, (10, wing_y, 15, 10))
+
+        # Draw eye
+        pygame.draw.circle(bird_surface, WHITE, (28, 12), 4)
+        pygame.draw.circle(bird_surface, BLACK, (29, 12), 2)
+
+        # Rotate bird surface
+        rotated_bird = pygame.transform.rotate(bird_surface, angle_index * self.ANGLE_STEP)
+        if pygame.display.get_surface() is not None:
+            rotated_bird = rotated_bird.convert_alpha()
+        return rotated_bird, rotated_bird.get_width() // 2, rotated_bird.get_height() // 2
+
+class ParallaxLayer:
+    # A pre-rendered strip whose content repeats every `period` pixels and
+    # that is at least as wide as the screen, so any scroll offset is covered
+    # by at most two blits however much the strip contains
+    def __init__(self, strip, period, y=0, sprites=()):
+        self.strip = strip
+        self.period = period
+        self.y = y
+        self.sprites = sprites  # rects of the drawn shapes within one period, for dirty rects
+
+    def draw(self, surface, offset, dirty=None):
+        # Scrolled `offset` pixels to the left
+        x = -(offset % self.period)
+        width = surface.get_width()
+        strip_width = self.strip.get_width()
+        while x < width:
+            surface.blit(self.strip, (x, self.y))
+            if dirty is not None:
+                for rect in self.sprites:
+                    dirty.add(rect.move(x, self.y))
+            x += strip_width
+
+class ParallaxBackground:
+    # The background's stars, waves and minimal-style circles for one target
+    # size, pre-rendered once. Per frame only scroll offsets and a couple of
+    # table lookups (star twinkle, circle bob) change.
+    STAR_LAYERS = 3
+    STAR_COUNT = 50
+    STAR_SPEED = 12        # px/s of the farthest layer; nearer layers are multiples
+    WAVE_COUNT = 3
+    PHASES = [2 * math.pi * i / 64 for i in range(64)]
+    TABLE_SIZE = len(PHASES)
+    # Star layer alpha over one twinkle cycle
+    TWINKLE = [int(90 + 165 * (math.sin(phase) + 1) / 2) for phase in PHASES]
+    # Vertical circle offset over one bob cycle, in unscaled pixels
+    BOB = [math.sin(phase) * 50 for phase in PHASES]
+
+    def __init__(self, width, height, scale=1.0):
+        self.size = (width, height)
+        self.scale = scale
+        convert = pygame.display.get_surface() is not None
+
+        # Stars: one full-width strip per depth layer, colorkeyed and RLE
+        # encoded so blitting skips the empty space
+        self.star_layers = []
+        for layer in range(self.STAR_LAYERS):
+            strip = pygame.Surface((width, height))
+            if convert:
+                strip = strip.convert()
+            sprites = []
+            for i in range(layer, self.STAR_COUNT, self.STAR_LAYERS):
+                radius = max(1, int((2 + i * 7 % 5) * scale))
+                x = int(i * 30 % SCREEN_WIDTH * scale)
+                y = int(i * 20 % SCREEN_HEIGHT * scale)
+                for wrap in (-width, 0, width):
+                    rect = pygame.draw.circle(strip, PRIMARY, (x + wrap, y), radius)
+                    if rect.width:
+                        sprites.append(rect)
+            strip.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+            self.star_layers.append(ParallaxLayer(strip, width, sprites=sprites))
+
+        # Waves: one wavelength-periodic strip per wave, wide enough to
+        # cover the screen from any scroll offset with two blits
+        self.wave_layers = []
+        for i in range(self.WAVE_COUNT):
+            amplitude = 20 * (i + 1) * scale
+            period = max(2, round(200 * math.pi * scale))
+            strip_width = period * (width // period + 1)
+            strip_height = int(2 * amplitude) + 4
+            color = tuple(map(lambda x: x * (0.5 - i * 0.1), WHITE))
+            strip = pygame.Surface((strip_width, strip_height), pygame.SRCALPHA)
+            strip.fill((*color, 0))
+            points = [(x, strip_height / 2 + math.sin(2 * math.pi * x / period) * amplitude)
+                      for x in range(0, strip_width + 1, 2)]
+            pygame.draw.aalines(strip, color, False, points)
+            if convert:
+                strip = strip.convert_alpha()
+            strip.set_alpha(255, pygame.RLEACCEL)
+            y = int((SCREEN_HEIGHT - 150 + i * 50) * scale - strip_height / 2)
+            self.wave_layers.append(ParallaxLayer(strip, period, y))
+
+        # Minimal style: one circle sprite blitted per circle
+        radius = max(1, int(20 * scale))
+        self.circle = pygame.Surface((2 * radius, 2 * radius))
+        if convert:
+            self.circle = self.circle.convert()
+        self.circle.fill(BACKGROUND)
+        pygame.draw.circle(self.circle, tuple(map(lambda x: x * 0.3, PRIMARY)), (radius, radius), radius)
+        self.circle.set_colorkey(BACKGROUND, pygame.RLEACCEL)
+        self.circle_radius = radius
+
+    def draw_stars(self, surface, current_time, layers, dirty=None):
+        for i, layer in enumerate(self.star_layers[:layers]):
+            # Each layer twinkles with its own phase; nearer layers drift faster
+            layer.strip.set_alpha(self.TWINKLE[int(current_time * 8 + i * 21) % self.TABLE_SIZE],
+                                  pygame.RLEACCEL)
+            layer.draw(surface, -current_time * self.STAR_SPEED * (i + 1) * self.scale, dirty)
+
+    def draw_waves(self, surface, current_time, layers):
+        for i, layer in enumerate(self.wave_layers[:layers]):
+            # Same phase speed as sin(x / 100 + t * frequency)
+            layer.draw(surface, current_time * (i + 1) * 0.5 * 100 * self.scale)
+
+    def draw_circles(self, surface, current_time, dirty=None):
+        scale = self.scale
+        radius = self.circle_radius
+        table = self.BOB
+        steps = self.TABLE_SIZE / (2 * math.pi)
+        batch = []
+        for i in range(10):
+            pos = ((current_time * 50 + i * 100) % (SCREEN_WIDTH + 200)) - 100
+            bob = table[int((current_time + i) * steps) % self.TABLE_SIZE]
+            batch.append((self.circle, (int(pos * scale) - radius,
+                                        int((SCREEN_HEIGHT / 2 + bob) * scale) - radius)))
+        rects = surface.blits(batch)
+        if dirty is not None:
+            dirty.extend(rects)
+
+class FrameProfiler:
+    # Per-stage frame timings kept in a fixed-size ring buffer
+    STAGES = ("events", "simulation", "background", "particles", "pipes",
+              "compose", "bird", "hud", "overlay", "flip", "tick_wait")
+    STAGE_COLORS = [
+        (200, 200, 200), ACCENT_SECONDARY, PRIMARY, ACCENT, (255, 140, 0),
+        (120, 220, 120), GOLD, WHITE, NEON_PINK, CRYSTAL, (70, 70, 70)
+    ]
+    GRAPH_WIDTH = 240
+    GRAPH_HEIGHT = 80
+    BAR_WIDTH = 2
+    MS_PER_PIXEL = 0.25  # 20 ms fills the graph
+    LABEL_INTERVAL = 30  # frames between p50/p99 label refreshes
+
+    def __init__(self, capacity=600):
+        self.capacity = capacity
+        self.stage_count = len(self.STAGES)
+        self.samples = array('d', bytes(8 * capacity * self.stage_count))  # seconds
+        self.frame_starts = array('d', bytes(8 * capacity))
+        self.totals = array('d', bytes(8 * capacity))  # per-frame sums of samples
+        self.index = 0
+        self.count = 0
+        self._stage_index = {name: i for i, name in enumerate(self.STAGES)}
+        self._current = [0.0] * self.stage_count
+        self._frame_start = self._last = time.perf_counter()
+        self._graph = None
+        self._font = None
+        self._label = None
+        self._label_age = 0
+
+    def begin_frame(self):
+        self._frame_start = self._last = time.perf_counter()
+        current = self._current
+        for i in range(self.stage_count):
+            current[i] = 0.0
+
+    def mark(self, stage):
+        # Charge the time since the previous mark to `stage`
+        now = time.perf_counter()
+        self._current[self._stage_index[stage]] += now - self._last
+        self._last = now
+
+    def end_frame(self):
+        base = self.index * self.stage_count
+        self.samples[base:base + self.stage_count] = array('d', self._current)
+        self.frame_starts[self.index] = self._frame_start
+        self.totals[self.index] = sum(self._current)
+        self.index = (self.index + 1) % self.capacity
+        self._label_age += 1
+        self.count = min(self.count + 1, self.capacity)
+        if self._graph is not None:
+            self._draw_column(self._current)
+
+    def frames(self):
+        # Recorded frames, oldest first, as (start time, [stage seconds])
+        start = self.index - self.count
+        for i in range(start, self.index):
+            slot = i % self.capacity
+            base = slot * self.stage_count
+            yield self.frame_starts[slot], self.samples[base:base + self.stage_count]
+
+    def percentiles(self, *points):
+        # Slot order does not matter once sorted
+        totals = sorted(self.totals[:self.count])
+        if not totals:
+            return [0.0 for _ in points]
+        return [totals[min(len(totals) - 1, int(len(totals) * p / 100))] * 1000 for p in points]
+
+    def _draw_column(self, stages):
+        # Scroll the persistent graph and stack this frame's stages in one column
+        graph = self._graph
+        graph.scroll(-self.BAR_WIDTH, 0)
+        x = self.GRAPH_WIDTH - self.BAR_WIDTH
+        graph.fill((0, 0, 0, 160), (x, 0, self.BAR_WIDTH, self.GRAPH_HEIGHT))
+        y = self.GRAPH_HEIGHT
+        for seconds, color in zip(stages, self.STAGE_COLORS):
+            height = seconds * 1000 / self.MS_PER_PIXEL
+            if height >= 0.5 and y > 0:
+                top = max(0, int(y - height))
+                graph.fill(color, (x, top, self.BAR_WIDTH, int(y) - top or 1))
+                y -= height
+
+    def draw(self, surface, x, y):
+        if self._graph is None:
+            self._graph = pygame.Surface((self.GRAPH_WIDTH, self.GRAPH_HEIGHT), pygame.SRCALPHA)
+            self._graph.fill((0, 0, 0, 160))
+            self._font = pygame.font.Font(None, 20)
+        surface.blit(self._graph, (x, y))
+        # 60 FPS budget line
+        budget_y = y + self.GRAPH_HEIGHT - int(1000 / FPS / self.MS_PER_PIXEL)
+        pygame.draw.line(surface, ACCENT, (x, budget_y), (x + self.GRAPH_WIDTH, budget_y))
+        # Sorting the whole history every frame would cost more than the HUD
+        if self._label is None or self._label_age >= self.LABEL_INTERVAL:
+            p50, p99 = self.percentiles(50, 99)
+            self._label = self._font.render(f"frame p50 {p50:.1f} ms  p99 {p99:.1f} ms", True, WHITE)
+            self._label_age = 0
+        label_rect = surface.blit(self._label, (x, y + self.GRAPH_HEIGHT + 4))
+        return label_rect.union((x, y, self.GRAPH_WIDTH, self.GRAPH_HEIGHT))
+
+    def export_csv(self, path):
+        with open(path, 'w') as f:
+            f.write("frame_start_s," + ",".join(f"{name}_ms" for name in self.STAGES) + ",total_ms\n")
+            for start, stages in self.frames():
+                f.write(f"{start:.6f}," + ",".join(f"{s * 1000:.3f}" for s in stages)
+                        + f",{sum(stages) * 1000:.3f}\n")
+
+    def export_chrome_trace(self, path):
+        # Chrome trace / Perfetto "complete" events, one per stage per frame
+        events = []
+        origin = None
+        for frame, (start, stages) in enumerate(self.frames()):
+            if origin is None:
+                origin = start
+            ts = (start - origin) * 1e6
+            events.append({'name': "frame", 'ph': "X", 'pid': 0, 'tid': 0, 'ts': ts,
+                           'dur': sum(stages) * 1e6, 'args': {'frame': frame}})
+            for name, seconds in zip(self.STAGES, stages):
+                if seconds > 0:
+                    events.append({'name': name, 'ph': "X", 'pid': 0, 'tid': 1,
+                                   'ts': ts, 'dur': seconds * 1e6})
+                    ts += seconds * 1e6
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': "ms"}, f)
+
+    def export(self, directory="profiles"):
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        base = os.path.join(directory, f"frame_profile-{stamp}")
+        self.export_csv(base + ".csv")
+        self.export_chrome_trace(base + ".json")
+        return base
+
+class GameOverOverlay:
+    # Everything the game-over screen shows, rendered once per game over;
+    # the fade, pulse and slide-in animations only change alpha and position
+    FADE_MS = 1000
+    STAT_DELAY_MS = 500
+    STAT_FADE_MS = 500
+    SCALE_STEPS = 20
+
+    def __init__(self, state, previous_high_score):
+        self.state = state
+        width, height = SCREEN_WIDTH, SCREEN_HEIGHT
+        convert = pygame.display.get_surface() is not None
+
+        # Dark -> accent -> dark vertical gradient with per-pixel alpha, built
+        # as a 1-pixel strip and stretched
+        stops = [(0, 0, 0, 192), (*ACCENT, 64), (0, 0, 0, 192)]
+        strip = pygame.Surface((1, height), pygame.SRCALPHA)
+        half = height / 2
+        for y in range(height):
+            segment = min(1, int(y / half))
+            progress = (y - segment * half) / half
+            start, end = stops[segment], stops[segment + 1]
+            strip.set_at((0, y), tuple(int(a + (b - a) * progress) for a, b in zip(start, end)))
+        self.gradient = pygame.transform.scale(strip, (width, height))
+        self.pulse = pygame.Surface((width, height))
+        self.pulse.fill(ACCENT)
+        if convert:
+            self.gradient = self.gradient.convert_alpha()
+            self.pulse = self.pulse.convert()
+
+        # "Game Over!" and its glow at every step of the entrance zoom
+        title = text_cache.font(72).render('Game Over!', True, WHITE)
+        glow = text_cache.font(72).render('Game Over!', True, ACCENT)
+        self.title_frames = []
+        for step in range(self.SCALE_STEPS + 1):
+            scale = 1.5 - 0.5 * step / self.SCALE_STEPS
+            size = (int(title.get_width() * scale), int(title.get_height() * scale))
+            self.title_frames.append((pygame.transform.scale(title, size),
+                                      pygame.transform.scale(glow, size)))
+
+        # Stat lines, faded in with set_alpha
+        score = state.score
+        stats = state.stats
+        stats_data = [
+            (f'Final Score: {score}', GOLD if score > previous_high_score else WHITE),
+            (f'High Score: {max(score, previous_high_score)}', GOLD),
+            (f'Perfect Passes: {stats["perfect_passes"]}', ACCENT_SECONDARY),
+            (f'Max Combo: x{stats["max_combo"]}', PRIMARY),
+            (f'Coins Earned: ${stats["total_coins"]}', GOLD)
+        ]
+        self.stat_lines = [text_cache.font(36).render(text, True, color) for text, color in stats_data]
+
+    def draw(self, surface, elapsed, effects=True):
+        fade_progress = min(1.0, elapsed / self.FADE_MS)
+
+        # Apply overlays
+        self.gradient.set_alpha(int(255 * fade_progress))
+        surface.blit(self.gradient, (0, 0))
+        if effects:
+            pulse = (math.sin(pygame.time.get_ticks() / 300) + 1) / 2
+            pulse_alpha = int(32 * pulse * fade_progress)
+            if pulse_alpha > 0:
+                self.pulse.set_alpha(pulse_alpha)
+                surface.blit(self.pulse, (0, 0))
+
+        # Dramatic entrance animation for game over text
+        title, glow = self.title_frames[int(fade_progress * self.SCALE_STEPS)]
+        center = (SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 120 - 50 * (1 - fade_progress))
+        title_rect = title.get_rect(center=center)
+        if effects:
+            # Pulsing glow behind the text
+            glow.set_alpha(int(255 * (math.sin(elapsed / 200) + 1) / 2))
+            surface.blit(glow, (title_rect.x + 2, title_rect.y + 2))
+        surface.blit(title, title_rect)
+
+        # Stats display with sequential slide and fade
+        stats_y = SCREEN_HEIGHT//2 - 40
+        stats_spacing = 40
+        for i, line in enumerate(self.stat_lines):
+            stat_delay = self.STAT_DELAY_MS * (i + 1)
+            if elapsed > stat_delay:
+                stat_progress = min(1.0, (elapsed - stat_delay) / self.STAT_FADE_MS)
+                x_offset = (1 - stat_progress) * 100
+                line.set_alpha(int(255 * stat_progress))
+                surface.blit(line, line.get_rect(center=(SCREEN_WIDTH//2 + x_offset, stats_y + stats_spacing * i)))
+
+class DirtyRects:
+    # Presents only the screen areas layers reported as changed this frame,
+    # together with last frame's areas so whatever moved away is repainted.
+    # Falls back to a full flip after invalidate() or when the dirty area
+    # passes FULL_FLIP_THRESHOLD of the screen.
+    FULL_FLIP_THRESHOLD = 0.4
+
+    def __init__(self, width, height, enabled=False):
+        self.screen_rect = pygame.Rect(0, 0, width, height)
+        self.enabled = enabled
+        self.rects = []
+        self._previous = []
+        self._full = True
+        self.full_flips = 0
+        self.partial_updates = 0
+
+    # Callers report rects unconditionally; with the mode off nothing is kept
+    def add(self, rect):
+        if self.enabled:
+            self.rects.append(rect)
+
+    def extend(self, rects):
+        if self.enabled:
+            self.rects.extend(rects)
+
+    def invalidate(self):
+        # Whole screen changed: scene switch, full-screen layer, mode change
+        self._full = True
+
+    def present(self):
+        if not self.enabled:
+            pygame.display.flip()
+            self.full_flips += 1
+            # Nothing was tracked, so the first partial update needs a full flip
+            self._full = True
+            self._previous = []
+            return
+        screen_rect = self.screen_rect
+        current = [rect for rect in map(screen_rect.clip, self.rects) if rect.width and rect.height]
+        self.rects = []
+        if not self._full:
+            rects = current + self._previous
+            # Overlaps are counted twice, which only makes the fallback earlier
+            area = sum(rect.width * rect.height for rect in rects)
+            if area <= self.FULL_FLIP_THRESHOLD * screen_rect.width * screen_rect.height:
+                pygame.display.update(rects)
+                self.partial_updates += 1
+                self._previous = current
+                return
+        pygame.display.flip()
+        self.full_flips += 1
+        self._full = False
+        self._previous = current
+
+class Compositor:
+    # Gameplay layers (background, particles, pipes) draw into a world layer
+    # that compose() puts on the screen through the camera: stretched when
+    # the world renders at a reduced `scale` (chosen by QualityGovernor) and
+    # shifted by `camera` for screen shake. The world layer is the screen
+    # itself when neither applies and a persistent buffer otherwise, so
+    # composing never allocates. The HUD draws straight onto the screen
+    # afterwards and never moves.
+    def __init__(self, width, height):
+        self.size = (width, height)
+        self.scale = 1.0
+        self.camera = (0, 0)
+        self._buffers = {}
+        self._stretched = None
+
+    def world(self, screen):
+        # Surface the world layers should draw into this frame
+        scale = self.scale
+        if scale == 1.0 and self.camera == (0, 0):
+            return screen
+        buffer = self._buffers.get(scale)
+        if buffer is None:
+            buffer = self._buffers[scale] = self._surface(*self.world_size(scale))
+        return buffer
+
+    def world_size(self, scale):
+        width, height = self.size
+        return max(1, int(width * scale)), max(1, int(height * scale))
+
+    def compose(self, world, screen):
+        if world is screen:
+            return
+        dx, dy = self.camera
+        size = screen.get_size()
+        if dx == 0 and dy == 0:
+            # Stretch the reduced-resolution world over the whole screen in place
+            pygame.transform.scale(world, size, screen)
+            return
+        if world.get_size() != size:
+            if self._stretched is None:
+                self._stretched = self._surface(*size)
+            pygame.transform.scale(world, size, self._stretched)
+            world = self._stretched
+        screen.blit(world, (dx, dy))
+        # Clear the strips the shifted world no longer covers
+        width, height = size
+        if dx:
+            screen.fill(BACKGROUND, (0 if dx > 0 else width + dx, 0, abs(dx), height))
+        if dy:
+            screen.fill(BACKGROUND, (0, 0 if dy > 0 else height + dy, width, abs(dy)))
+
+    @staticmethod
+    def _surface(width, height):
+        surface = pygame.Surface((width, height))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        return surface
+
+class QualityGovernor:
+    # Graded quality levels, best first, chosen from a rolling average of
+    # frame work time. Drops a level as soon as the average goes over budget,
+    # but only climbs back after it has stayed well under budget for a while,
+    # so a level that just proved too expensive is not retried right away.
+    LEVELS = (
+        {"name": "ultra", "max_particles": 4096, "wave_layers": 3, "star_layers": 3,
+         "gradient_interval": 1, "overlay_effects": True, "render_scale": 1.0},
+        {"name": "high", "max_particles": 2048, "wave_layers": 3, "star_layers": 3,
+         "gradient_interval": 2, "overlay_effects": True, "render_scale": 1.0},
+        {"name": "medium", "max_particles": 1024, "wave_layers": 3, "star_layers": 3,
+         "gradient_interval": 4, "overlay_effects": True, "render_scale": 0.85},
+        {"name": "low", "max_particles": 512, "wave_layers": 2, "star_layers": 2,
+         "gradient_interval": 8, "overlay_effects": False, "render_scale": 0.75},
+        {"name": "very low", "max_particles": 256, "wave_layers": 1, "star_layers": 1,
+         "gradient_interval": 15, "overlay_effects": False, "render_scale": 0.6},
+        {"name": "minimum", "max_particles": 128, "wave_layers": 1, "star_layers": 0,
+         "gradient_interval": 30, "overlay_effects": False, "render_scale": 0.5},
+    )
+    TARGET_MS = 1000 / FPS * 0.8   # leave room for present and vsync
+    HEADROOM = 0.6                 # climb only below this fraction of the target
+    SMOOTHING = 0.1
+    DOWN_COOLDOWN = 30             # frames for the average to settle after a drop
+    UP_DELAY = 120                 # frames of sustained headroom before climbing
+    HISTORY = 64
+
+    def __init__(self, enabled=True, dynamic_resolution=True, min_render_scale=0.5):
+        self.enabled = enabled
+        self.dynamic_resolution = dynamic_resolution
+        self.min_render_scale = min_render_scale
+        self.level = 0
+        self.average_ms = 0.0
+        self.frames = 0
+        self.decisions = deque(maxlen=self.HISTORY)  # recent level changes, oldest first
+        self._cooldown = self.DOWN_COOLDOWN
+        self._headroom_frames = 0
+
+    @property
+    def current(self):
+        return self.LEVELS[self.level]
+
+    @property
+    def name(self):
+        return self.current["name"]
+
+    @property
+    def render_scale(self):
+        if not self.dynamic_resolution:
+            return 1.0
+        return max(self.min_render_scale, self.current["render_scale"])
+
+    def render_scales(self):
+        # Every scale render_scale can return, largest first
+        if not self.dynamic_resolution:
+            return [1.0]
+        return sorted({max(self.min_render_scale, level["render_scale"]) for level in self.LEVELS},
+                      reverse=True)
+
+    def update(self, frame_ms):
+        # Feed the CPU time of the last frame (excluding the frame-rate wait);
+        # returns the decision dict when the level changed, otherwise None
+        self.frames += 1
+        self.average_ms += (frame_ms - self.average_ms) * self.SMOOTHING
+        if not self.enabled:
+            return self._set_level(0, "disabled") if self.level else None
+        if self._cooldown > 0:
+            self._cooldown -= 1
+            return None
+        if self.average_ms > self.TARGET_MS:
+            self._headroom_frames = 0
+            if self.level < len(self.LEVELS) - 1:
+                self._cooldown = self.DOWN_COOLDOWN
+                return self._set_level(self.level + 1, "over budget")
+        elif self.average_ms < self.TARGET_MS * self.HEADROOM:
+            self._headroom_frames += 1
+            if self._headroom_frames >= self.UP_DELAY and self.level > 0:
+                self._headroom_frames = 0
+                return self._set_level(self.level - 1, "headroom")
+        else:
+            self._headroom_frames = 0
+        return None
+
+    def _set_level(self, level, reason):
+        decision = {
+            "frame": self.frames,
+            "from": self.name,
+            "to": self.LEVELS[level]["name"],
+            "reason": reason,
+            "average_ms": round(self.average_ms, 2)
+        }
+        self.level = level
+        self.decisions.append(decision)
+        return decision
 
 class Settings:
+    PATH = 'settings.json'
+
     def __init__(self):
         self.difficulty = "normal"
         self.volume = 0.5
@@ -202,37 +1075,173 @@ class Settings:
         self.current_obstacle = "default"
         self.background_style = "dynamic"  # dynamic, static, minimal
         self.color_theme = "default"       # default, dark, neon, pastel
+        self.dirty_rects = False           # partial display updates (software renderers)
+        self.max_fps = 120                 # gameplay render cap; physics always runs at TICK_RATE
+        self.max_catch_up = 5              # ticks simulated per frame before dropping time
+        self.dynamic_resolution = True     # lower the world's render scale to hold the frame rate
+        self.min_render_scale = 0.5
+        self.adaptive_quality = True       # trade effects for frame rate when frames run long
+        self.ghost_racing = False          # replay the best run's course with its ghost
+        self.debug_overlay = False         # frame profiler and quality HUD, toggled with F3
         self.controls = {
             "jump": pygame.K_SPACE,
             "pause": pygame.K_ESCAPE,
             "quick_reset": pygame.K_r
         }
+        self._writer = SettingsWriter(self.PATH)
+        # Last-chance flush for exits that bypass Game.quit
+        atexit.register(self.flush)
+
+    def snapshot(self):
+        # Every persistent field, serialized on the calling thread so the
+        # writer never sees lists the game is still mutating
+        return json.dumps({key: value for key, value in self.__dict__.items()
+                           if not key.startswith('_')}, indent=2)
 
     def save(self):
-        data = {
-            'difficulty': self.difficulty,
-            'volume': self.volume,
-            'background_theme': self.background_theme,
-            'coins': self.coins,
-            'unlocked_birds': self.unlocked_birds,
-            'unlocked_obstacles': self.unlocked_obstacles,
-            'current_bird': self.current_bird,
-            'current_obstacle': self.current_obstacle
-        }
-        with open('settings.json', 'w') as f:
-            json.dump(data, f)
+        # Non-blocking: the write happens on the writer thread
+        self._writer.submit(self.snapshot())
+
+    def flush(self):
+        self._writer.flush()
 
     def load(self):
         try:
-            with open('settings.json', 'r') as f:
+            with open(self.PATH, 'r') as f:
                 data = json.load(f)
-                self.__dict__.update(data)
         except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            # Unreadable or corrupt save: set it aside and start from defaults
+            try:
+                os.replace(self.PATH, self.PATH + '.corrupt')
+            except OSError:
+                pass
+            return
+        if isinstance(data, dict):
+            self.__dict__.update({key: value for key, value in data.items()
+                                  if key in self.__dict__ and not key.startswith('_')})
+
+class SettingsWriter:
+    # Write-behind persistence: submit() hands over a serialized snapshot and
+    # returns at once. A daemon thread writes the newest snapshot after
+    # DELAY seconds without further submits, atomically via a temp file and
+    # os.replace, so a crash mid-write leaves the previous save intact.
+    DELAY = 0.5
+
+    def __init__(self, path):
+        self.path = path
+        self.writes = 0
+        self._pending = None
+        self._deadline = 0
+        self._writing = False
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def submit(self, data):
+        with self._condition:
+            self._pending = data
+            self._deadline = time.monotonic() + self.DELAY
+            if self._thread is None:
+                self._thread = Utils.start_thread(self._run) or False
+            self._condition.notify_all()
+        if self._thread is False:
+            # No writer thread: write through
+            self.flush()
+
+    def flush(self):
+        # Write any pending snapshot now, on the calling thread
+        with self._condition:
+            while self._writing:
+                self._condition.wait()
+            data, self._pending = self._pending, None
+        if data is not None:
+            self._write(data)
+
+    def _run(self):
+        condition = self._condition
+        while True:
+            with condition:
+                while True:
+                    if self._pending is None:
+                        condition.wait()
+                        continue
+                    remaining = self._deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    condition.wait(remaining)
+                data, self._pending = self._pending, None
+                self._writing = True
+            try:
+                self._write(data)
+            finally:
+                with condition:
+                    self._writing = False
+                    condition.notify_all()
+
+    def _write(self, data):
+        temp_path = self.path + '.tmp'
+        try:
+            with open(temp_path, 'w') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self.writes += 1
+        except OSError:
+            # Keep the previous file; the next save retries
             pass
 
+class FileWriter:
+    # Runs file-writing jobs (replays, ghosts) in submission order on one
+    # daemon thread, so a game over never waits on disk. Where threads are
+    # unavailable, submit() runs the job inline.
+    def __init__(self):
+        self._jobs = deque()
+        self._busy = False
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def submit(self, job, *args):
+        with self._condition:
+            if self._thread is None:
+                self._thread = Utils.start_thread(self._run) or False
+            if self._thread is not False:
+                self._jobs.append((job, args))
+                self._condition.notify_all()
+                return
+        job(*args)
+
+    def flush(self):
+        # Wait for every job submitted so far
+        with self._condition:
+            while self._jobs or self._busy:
+                self._condition.wait()
+
+    def _run(self):
+        condition = self._condition
+        while True:
+            with condition:
+                while not self._jobs:
+                    condition.wait()
+                job, args = self._jobs.popleft()
+                self._busy = True
+            try:
+                job(*args)
+            except Exception:
+                # One bad job must not stop the writer, or flush() never returns
+                logger.exception("File writer job %r failed", job)
+            finally:
+                with condition:
+                    self._busy = False
+                    condition.notify_all()
+
 class Game:
     def __init__(self):
         global SCREEN_WIDTH, SCREEN_HEIGHT
+        start = time.perf_counter()
+        # Milliseconds per startup stage, reported after the first frame
+        self.startup_times = {'import': (start - STARTUP_TIME) * 1000}
         
         # Initialize display - get actual screen size for mobile
         self.settings = Settings()
@@ -259,30 +1268,82 @@ class Game:
 
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), display_flags)
         pygame.display.set_caption("Modern Flappy Bird")
+        self.startup_times['display'] = (time.perf_counter() - start) * 1000
         self.clock = pygame.time.Clock()
         self.state = "menu"
         self.particles = ParticleSystem()
-        self.background_offset = 0
-        self.font = pygame.font.Font(None, 36)
+        self.replay = None  # Replay to play back instead of reading input
+        self.run_history = RunHistory(threaded=not IS_WEB)
+        self.file_writer = FileWriter()
+        self.profiler = FrameProfiler()
+        self.bird_sprites = BirdSpriteCache()
+        self.game_over_overlay = None
+        self.dirty = DirtyRects(SCREEN_WIDTH, SCREEN_HEIGHT, self.settings.dirty_rects)
+        self.compositor = Compositor(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.quality = QualityGovernor(self.settings.adaptive_quality, self.settings.dynamic_resolution,
+                                       self.settings.min_render_scale)
+        self._background_gradient = None
+        self._gradient_age = 0
+        self._parallax = OrderedDict()  # (width, height) -> ParallaxBackground, least recent first
         
         # Create UI elements
         self.create_ui_elements()
         
         # Initialize sound effects
+        start = time.perf_counter()
         self.init_sounds()
+        self.startup_times['sounds'] = (time.perf_counter() - start) * 1000
+        self._first_frame_start = time.perf_counter()
+
+    def present(self):
+        self.dirty.present()
+        if self._first_frame_start is not None:
+            self.startup_times['first_frame'] = (time.perf_counter() - self._first_frame_start) * 1000
+            self._first_frame_start = None
+            if self.settings.debug_overlay:
+                self.report_startup()
+            # Warm NumPy up off the main thread now that something is on screen
+            Utils.start_thread(accel.numpy)
+
+    def report_startup(self):
+        times = self.startup_times
+        stages = ", ".join(f"{stage.replace('_', ' ')} {ms:.1f} ms" for stage, ms in times.items())
+        numpy_state = "loaded" if "numpy" in sys.modules else "not loaded"
+        logger.info("Startup: %s (total %.1f ms, numpy %s)", stages, sum(times.values()), numpy_state)
+
+    def quit(self):
+        self.settings.save()
+        self.settings.flush()
+        self.run_history.flush()
+        self.file_writer.flush()
+        pygame.quit()
+        sys.exit()
+
+    async def wait_frame(self, fps=FPS):
+        # End of every scene frame: pace with the clock natively, then yield
+        # to the event loop (in the browser its animation loop paces frames)
+        if not IS_WEB:
+            self.clock.tick(fps)
+        await asyncio.sleep(0)
 
     def run(self):
+        asyncio.run(self.run_async())
+
+    async def run_async(self):
+        # Scenes are coroutines that await wait_frame() once per frame
         while True:
             if self.state == "menu":
-                self.main_menu()
+                await self.main_menu()
             elif self.state == "playing":
-                self.play_game()
+                await self.play_game()
             elif self.state == "settings":
-                self.settings_menu()
+                await self.settings_menu()
             elif self.state == "shop":
-                self.shop_menu()
+                await self.shop_menu()
+            elif self.state == "leaderboard":
+                await self.leaderboard_screen()
             elif self.state == "credits":
-                self.credits_screen()
+                await self.credits_screen()
 
     def create_ui_elements(self):
         # Main menu buttons
@@ -291,68 +1352,85 @@ class Game:
             Button(center_x, 200, 200, 50, "Play"),
             Button(center_x, 275, 200, 50, "Settings"),
             Button(center_x, 350, 200, 50, "Shop"),
-            Button(center_x, 425, 200, 50, "Credits")
+            Button(center_x, 425, 200, 50, "Leaderboard"),
+            Button(center_x, 500, 200, 50, "Credits")
         ]
         
         # Settings controls
         self.volume_slider = Slider(center_x, 300, 200, 20)
 
+        # Close (X) button shared by the menu screens
+        self.close_button = Button(SCREEN_WIDTH - 60, 10, 50, 50, "X", color=ACCENT)
+
     def init_sounds(self):
-        sample_rate = 44100
-        
-        # Jump sound (fun 8-bit style jump)
-        t = np.linspace(0, 0.1, int(sample_rate * 0.1))
-        freq = np.interp(t, [0, 0.1], [800, 1200])  # Frequency sweep
-        jump_wave = np.sin(2 * np.pi * freq * t) * np.exp(-t * 10)
-        # Add harmonics for richer sound
-        jump_wave += 0.5 * np.sin(4 * np.pi * freq * t) * np.exp(-t * 10)
-        jump_wave += 0.25 * np.sin(8 * np.pi * freq * t) * np.exp(-t * 10)
-        self.jump_sound = pygame.mixer.Sound(np.int16(jump_wave * 16383).tobytes())
-        
-        # Point sound (coin collect style)
-        t = np.linspace(0, 0.1, int(sample_rate * 0.1))
-        freq1 = np.interp(t, [0, 0.1], [600, 1000])
-        freq2 = np.interp(t, [0, 0.1], [900, 1500])
-        point_wave = np.sin(2 * np.pi * freq1 * t) * np.exp(-t * 15)
-        point_wave += np.sin(2 * np.pi * freq2 * t) * np.exp(-t * 15)
-        # Add sparkle effect
-        sparkle = np.sin(2 * np.pi * 2000 * t) * np.exp(-t * 30) * 0.3
-        point_wave = point_wave + sparkle
-        self.point_sound = pygame.mixer.Sound(np.int16(point_wave * 16383).tobytes())
-        
-        # Death sound (dramatic failure)
-        t = np.linspace(0, 0.3, int(sample_rate * 0.3))
-        freq_death = np.interp(t, [0, 0.3], [400, 200])
-        death_wave = np.sin(2 * np.pi * freq_death * t) * np.exp(-t * 3)
-        # Add impact effect
-        impact = np.sin(2 * np.pi * 100 * t) * np.exp(-t * 20)
-        death_wave = death_wave + impact
-        # Add distortion for dramatic effect
-        death_wave = np.clip(death_wave * 1.3, -1, 1)
-        self.death_sound = pygame.mixer.Sound(np.int16(death_wave * 16383).tobytes())
-        
-        # Create UI feedback sound (soft click)
-        t = np.linspace(0, 0.05, int(sample_rate * 0.05))
-        click_wave = np.sin(2 * np.pi * 800 * t) * np.exp(-t * 50)
-        self.ui_click = pygame.mixer.Sound(np.int16(click_wave * 8191).tobytes())
+        # Synthesized effects load from the on-disk cache; anything missing
+        # is synthesized on a background thread while silent placeholders
+        # stand in, and swapped in as soon as it is ready
+        self.sound_cache = sounds.SoundCache(pygame.mixer.get_init())
+        missing = []
+        for attr, name in SOUND_EFFECTS.items():
+            data = self.sound_cache.load(name)
+            if data is None:
+                missing.append((attr, name))
+                data = bytes(4)
+            setattr(self, attr, pygame.mixer.Sound(buffer=data))
+        if missing and Utils.start_thread(self._synthesize_sounds, missing) is None:
+            self._synthesize_sounds(missing)
+
+    def _synthesize_sounds(self, missing):
+        for attr, name in missing:
+            setattr(self, attr, pygame.mixer.Sound(buffer=self.sound_cache.render(name)))
+
+    def get_parallax(self, size, scale):
+        parallax = self._parallax.get(size)
+        if parallax is None:
+            parallax = self._parallax[size] = ParallaxBackground(*size, scale)
+            # One per governor scale step plus the screen; the screen-sized
+            # one is never evicted, since every menu draws it
+            limit = len(QualityGovernor.LEVELS) + 1
+            for key in list(self._parallax):
+                if len(self._parallax) <= limit:
+                    break
+                if key != (SCREEN_WIDTH, SCREEN_HEIGHT):
+                    del self._parallax[key]
+        else:
+            self._parallax.move_to_end(size)
+        return parallax
+
+    def prebuild_backgrounds(self):
+        # Build the background for every world scale the governor can pick,
+        # so a scale change mid-run never stalls on pre-rendering
+        for scale in self.quality.render_scales():
+            self.get_parallax(self.compositor.world_size(scale), scale)
 
-    def draw_background(self):
+    def draw_background(self, surface=None, scale=1.0):
+        # Draws in screen coordinates multiplied by `scale`, so the world can
+        # be rendered into a reduced-resolution buffer
+        surface = surface or self.screen
         current_time = pygame.time.get_ticks() / 1000
+        quality = self.quality.current
+        parallax = self.get_parallax(surface.get_size(), scale)
+        dirty = self.dirty if self.dirty.enabled else None
         
         if self.settings.background_style == "dynamic":
-            # Create amazing animated gradient background
-            gradient_offset = (math.sin(current_time * 0.5) + 1) / 2
-            color1 = PRIMARY
-            color2 = SECONDARY
-            color3 = ACCENT
-            
-            # Create multiple layers of gradients
-            base_gradient = Utils.create_gradient_surface(
-                SCREEN_WIDTH, SCREEN_HEIGHT,
-                tuple(map(lambda x, y: x * (1-gradient_offset) + y * gradient_offset, color1, color2)),
-                tuple(map(lambda x, y: x * gradient_offset + y * (1-gradient_offset), color2, color3))
-            )
-            self.screen.blit(base_gradient, (0, 0))
+            # Create amazing animated gradient background, re-picked every
+            # `gradient_interval` frames
+            base_gradient = self._background_gradient
+            self._gradient_age += 1
+            if (base_gradient is None or base_gradient.get_size() != surface.get_size()
+                    or self._gradient_age >= quality["gradient_interval"]):
+                gradient_offset = (math.sin(current_time * 0.5) + 1) / 2
+                color1 = PRIMARY
+                color2 = SECONDARY
+                color3 = ACCENT
+                base_gradient = self._background_gradient = Utils.get_gradient_surface(
+                    *surface.get_size(),
+                    tuple(map(lambda x, y: x * (1-gradient_offset) + y * gradient_offset, color1, color2)),
+                    tuple(map(lambda x, y: x * gradient_offset + y * (1-gradient_offset), color2, color3))
+                )
+                self._gradient_age = 0
+            surface.blit(base_gradient, (0, 0))
+            self.dirty.invalidate()
             
             # Add animated particles in background
             if self.settings.particle_effects:
@@ -366,76 +1444,31 @@ class Game:
                     )
             
             # Draw multiple animated wave patterns
-            for i in range(3):
-                points = []
-                amplitude = 20 * (i + 1)
-                frequency = (i + 1) * 0.5
-                y_offset = SCREEN_HEIGHT - 150 + i * 50
-                
-                for x in range(0, SCREEN_WIDTH + 10, 5):
-                    y = math.sin((x + self.background_offset * (i+1)) / 100 + current_time * frequency) * amplitude
-                    points.append((x, y_offset + y))
-                
-                if len(points) >= 2:
-                    color = tuple(map(lambda x: x * (0.5 - i * 0.1), WHITE))
-                    pygame.draw.aalines(self.screen, color, False, points)
+            parallax.draw_waves(surface, current_time, quality["wave_layers"])
         
         elif self.settings.background_style == "minimal":
             # Simple, clean background with subtle patterns
-            self.screen.fill(BACKGROUND)
-            for i in range(10):
-                pos = ((current_time * 50 + i * 100) % (SCREEN_WIDTH + 200)) - 100
-                pygame.draw.circle(
-                    self.screen,
-                    tuple(map(lambda x: x * 0.3, PRIMARY)),
-                    (int(pos), int(SCREEN_HEIGHT/2 + math.sin(current_time + i) * 50)),
-                    20
-                )
+            surface.fill(BACKGROUND)
+            parallax.draw_circles(surface, current_time, dirty)
         
         # Add parallax effect stars
-        for i in range(50):
-            x = (self.background_offset * (i % 3 + 1) / 5 + i * 30) % SCREEN_WIDTH
-            y = (math.sin(current_time + i) * 10 + i * 20) % SCREEN_HEIGHT
-            size = (math.sin(current_time * 2 + i) + 2) * 2
-            alpha = int(((math.sin(current_time + i) + 1) / 2) * 255)
-            star_color = (*PRIMARY, alpha)
-            pygame.draw.circle(self.screen, star_color, (int(x), int(y)), int(size))
-        
-        self.background_offset = (self.background_offset + 1) % 100
+        parallax.draw_stars(surface, current_time, quality["star_layers"], dirty)
 
-    def draw_bird(self, x, y, angle=0, invincibility_frames=0):
-        # Draw a more stylized bird using shapes
-        bird_color = (255, 200, 31)  # Yellow
-        
-        # Create a surface for the bird with alpha channel
-        bird_surface = pygame.Surface((40, 40), pygame.SRCALPHA)
-        
-        # If invincible, create flashing effect
-        if invincibility_frames > 0:
-            flash_intensity = abs(math.sin(pygame.time.get_ticks() / 100))
-            bird_color = tuple(map(lambda x: int(x * 0.7 + 255 * 0.3 * flash_intensity), bird_color))
-        
-        # Draw body with optional glow for invincibility
-        pygame.draw.ellipse(bird_surface, bird_color, (5, 5, 30, 20))
-        if invincibility_frames > 0:
-            glow_color = (*GOLD, int(64 * abs(math.sin(pygame.time.get_ticks() / 50))))
-            pygame.draw.ellipse(bird_surface, glow_color, (3, 3, 34, 24), 2)
-        
-        # Draw wing
-        wing_y = 15 + math.sin(pygame.time.get_ticks() / 100) * 3
-        wing_color = tuple(map(lambda x: int(x * 0.9), bird_color))
-        pygame.draw.ellipse(bird_surface, wing_color, (10, wing_y, 15, 10))
-        
-        # Draw eye
-        pygame.draw.circle(bird_surface, WHITE, (28, 12), 4)
-        pygame.draw.circle(bird_surface, BLACK, (29, 12), 2)
-        
-        # Rotate bird surface
-        rotated_bird = pygame.transform.rotate(bird_surface, angle)
-        bird_rect = rotated_bird.get_rect(center=(x, y))
-        self.screen.blit(rotated_bird, bird_rect)
+    def draw_bird(self, x, y, angle=0, invincibility_frames=0, alpha=None):
+        # One cached sprite lookup and one blit per frame; alpha draws the
+        # shared sprite translucent (ghosts) without caching a second copy
+        ticks = pygame.time.get_ticks()
+        flash = abs(math.sin(ticks / 100)) if invincibility_frames > 0 else None
+        sprite, half_width, half_height = self.bird_sprites.get(
+            self.settings.current_bird, angle, ticks / 100, flash)
+        if alpha is None:
+            self.dirty.add(self.screen.blit(sprite, (int(x) - half_width, int(y) - half_height)))
+        else:
+            sprite.set_alpha(alpha)
+            self.dirty.add(self.screen.blit(sprite, (int(x) - half_width, int(y) - half_height)))
+            sprite.set_alpha(None)
 
-    def main_menu(self):
+    async def main_menu(self):
         # Start UI music if not already playing
         if hasattr(self, 'ui_music') and self.ui_music is not None:
             if not pygame.mixer.Channel(1).get_busy():
@@ -444,6 +1477,7 @@ class Game:
         # Animation variables for floating title
         title_offset = 0
         particle_spawn_timer = 0
+        self.dirty.invalidate()
         
         while self.state == "menu":
             mouse_pos = pygame.mouse.get_pos()
@@ -464,23 +1498,19 @@ class Game:
             
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    self.settings.save()
-                    pygame.quit()
-                    sys.exit()
+                    self.quit()
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     # Handle close button
                     if self.close_button.rect.collidepoint(mouse_pos):
                         if hasattr(self, 'ui_click') and self.ui_click:
                             self.ui_click.play()
-                        self.settings.save()
-                        pygame.quit()
-                        sys.exit()
+                        self.quit()
                     
                     for i, button in enumerate(self.menu_buttons):
                         if button.rect.collidepoint(mouse_pos):
                             if hasattr(self, 'ui_click') and self.ui_click:
                                 self.ui_click.play()
-                            states = ["playing", "settings", "shop", "credits"]
+                            states = ["playing", "settings", "shop", "leaderboard", "credits"]
                             self.state = states[i]
                             # Stop UI music when starting game
                             if states[i] == "playing":
@@ -499,52 +1529,49 @@ class Game:
             
             # Update and draw particles
             self.particles.update()
-            self.particles.draw(self.screen)
+            self.particles.draw(self.screen, self.dirty)
             
             # Draw floating title with sine wave animation
             title_offset = math.sin(current_time / 500) * 10
-            title_font = pygame.font.Font(None, 72)
-            title = title_font.render("Modern Flappy Bird", True, WHITE)
-            title_shadow = title_font.render("Modern Flappy Bird", True, (*BLACK, 100))
+            title = text_cache.render("Modern Flappy Bird", True, WHITE, 72)
+            title_shadow = text_cache.render("Modern Flappy Bird", True, (*BLACK, 100), 72)
             title_rect = title.get_rect(center=(SCREEN_WIDTH//2, 100 + title_offset))
             shadow_rect = title_rect.copy()
             shadow_rect.y += 5
             shadow_rect.x += 5
-            self.screen.blit(title_shadow, shadow_rect)
-            self.screen.blit(title, title_rect)
+            self.dirty.add(self.screen.blit(title_shadow, shadow_rect))
+            self.dirty.add(self.screen.blit(title, title_rect))
             
             # Draw subtitle
-            subtitle_font = pygame.font.Font(None, 28)
-            subtitle = subtitle_font.render("Touch/Click anywhere to jump!", True, ACCENT)
+            subtitle = text_cache.render("Touch/Click anywhere to jump!", True, ACCENT, 28)
             subtitle_rect = subtitle.get_rect(center=(SCREEN_WIDTH//2, 160))
             self.screen.blit(subtitle, subtitle_rect)
             
             # Update and draw buttons with hover glow effect
             for button in self.menu_buttons:
                 button.update(mouse_pos)
-                button.draw(self.screen)
+                self.dirty.add(button.draw(self.screen))
                 # Add glow effect on hover
                 if button.rect.collidepoint(mouse_pos):
                     glow_surface = pygame.Surface((button.rect.width + 20, button.rect.height + 20), pygame.SRCALPHA)
                     glow_color = (*ACCENT, 50)
                     Utils.draw_rounded_rect(glow_surface, glow_color, 
                                           (0, 0, button.rect.width + 20, button.rect.height + 20), 15)
-                    self.screen.blit(glow_surface, (button.rect.x - 10, button.rect.y - 10))
+                    self.dirty.add(self.screen.blit(glow_surface, (button.rect.x - 10, button.rect.y - 10)))
             
             # Draw close button
             self.close_button.update(mouse_pos)
-            self.close_button.draw(self.screen)
+            self.dirty.add(self.close_button.draw(self.screen))
             
             # Draw version info
-            version_font = pygame.font.Font(None, 20)
-            version_text = version_font.render("v1.0.0 - Touch Enabled", True, (*WHITE, 150))
+            version_text = text_cache.render("v1.0.0 - Touch Enabled", True, (*WHITE, 150), 20)
             version_rect = version_text.get_rect(bottomright=(SCREEN_WIDTH - 10, SCREEN_HEIGHT - 10))
             self.screen.blit(version_text, version_rect)
             
-            pygame.display.flip()
-            self.clock.tick(FPS)
+            self.present()
+            await self.wait_frame()
 
-    def settings_menu(self):
+    async def settings_menu(self):
         difficulties = ["Easy", "Normal", "Hardcore"]
         current_diff_idx = difficulties.index(self.settings.difficulty.capitalize())
         
@@ -565,8 +1592,15 @@ class Game:
                 'vsync': Button(SCREEN_WIDTH//2 - 100, 490, 200, 40, "VSync: ON",
                               color=PRIMARY if self.settings.vsync else BACKGROUND),
                 'fullscreen': Button(SCREEN_WIDTH//2 - 100, 540, 200, 40, "Fullscreen: OFF",
-                                  color=PRIMARY if self.settings.fullscreen else BACKGROUND)
+                                  color=PRIMARY if self.settings.fullscreen else BACKGROUND),
+                'dirty_rects': Button(SCREEN_WIDTH//2 - 100, 590, 200, 40,
+                                   f"Partial Redraw: {'ON' if self.settings.dirty_rects else 'OFF'}",
+                                   color=PRIMARY if self.settings.dirty_rects else BACKGROUND),
+                'ghost_racing': Button(SCREEN_WIDTH//2 + 120, 590, 200, 40,
+                                    f"Ghost: {'ON' if self.settings.ghost_racing else 'OFF'}",
+                                    color=PRIMARY if self.settings.ghost_racing else BACKGROUND)
             }
+        self.dirty.invalidate()
 
         while self.state == "settings":
             mouse_pos = pygame.mouse.get_pos()
@@ -575,9 +1609,7 @@ class Game:
             
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    self.settings.save()
-                    pygame.quit()
-                    sys.exit()
+                    self.quit()
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         self.state = "menu"
@@ -620,6 +1652,17 @@ class Game:
                                 button.text = f"Fullscreen: {'ON' if self.settings.fullscreen else 'OFF'}"
                                 button.color = PRIMARY if self.settings.fullscreen else BACKGROUND
                                 pygame.display.toggle_fullscreen()
+                                self.dirty.invalidate()
+                            elif key == 'dirty_rects':
+                                self.settings.dirty_rects = not self.settings.dirty_rects
+                                button.text = f"Partial Redraw: {'ON' if self.settings.dirty_rects else 'OFF'}"
+                                button.color = PRIMARY if self.settings.dirty_rects else BACKGROUND
+                                self.dirty.enabled = self.settings.dirty_rects
+                                self.dirty.invalidate()
+                            elif key == 'ghost_racing':
+                                self.settings.ghost_racing = not self.settings.ghost_racing
+                                button.text = f"Ghost: {'ON' if self.settings.ghost_racing else 'OFF'}"
+                                button.color = PRIMARY if self.settings.ghost_racing else BACKGROUND
 
             # Update sliders
             for slider_key, slider in self.settings_sliders.items():
@@ -633,45 +1676,42 @@ class Game:
             self.draw_background()
             
             # Draw animated title
-            title_color = tuple(map(lambda x: x * (math.sin(current_time/500) * 0.2 + 0.8), WHITE))
-            title = self.font.render("Settings", True, title_color)
+            title_color = tuple(map(lambda x: x * Utils.quantize(math.sin(current_time/500) * 0.2 + 0.8), WHITE))
+            title = text_cache.render("Settings", True, title_color)
             title_rect = title.get_rect(center=(SCREEN_WIDTH//2, 100))
-            self.screen.blit(title, title_rect)
+            self.dirty.add(self.screen.blit(title, title_rect))
             
             # Draw sections with hover effects
             sections = ["Game", "Audio", "Graphics", "Controls"]
             for i, section in enumerate(sections):
                 y = 150 + i * 100
                 section_color = ACCENT if mouse_pos[1] in range(y, y+80) else WHITE
-                text = self.font.render(section, True, section_color)
-                self.screen.blit(text, (50, y))
+                text = text_cache.render(section, True, section_color)
+                self.dirty.add(self.screen.blit(text, (50, y)))
             
             # Draw difficulty selector with animation
             diff_color = tuple(map(lambda x: x * (math.sin(current_time/300) * 0.2 + 0.8), PRIMARY))
-            Utils.draw_rounded_rect(
-                self.screen,
-                diff_color,
-                (SCREEN_WIDTH//2 - 100, 200, 200, 50),
-                10
-            )
-            diff_text = self.font.render(f"Difficulty: {difficulties[current_diff_idx]}", True, WHITE)
+            diff_box = pygame.Rect(SCREEN_WIDTH//2 - 100, 200, 200, 50)
+            Utils.draw_rounded_rect(self.screen, diff_color, diff_box, 10)
+            self.dirty.add(diff_box)
+            diff_text = text_cache.render(f"Difficulty: {difficulties[current_diff_idx]}", True, WHITE)
             diff_rect = diff_text.get_rect(center=(SCREEN_WIDTH//2, 225))
             self.screen.blit(diff_text, diff_rect)
             
             # Draw volume controls
-            music_text = self.font.render("Music Volume", True, WHITE)
-            sfx_text = self.font.render("SFX Volume", True, WHITE)
+            music_text = text_cache.render("Music Volume", True, WHITE)
+            sfx_text = text_cache.render("SFX Volume", True, WHITE)
             self.screen.blit(music_text, (SCREEN_WIDTH//2 - 100, 250))
             self.screen.blit(sfx_text, (SCREEN_WIDTH//2 - 100, 310))
             
             # Draw sliders
             for slider in self.settings_sliders.values():
-                slider.draw(self.screen)
+                self.dirty.add(slider.draw(self.screen))
             
             # Draw toggle buttons with hover effects
             for button in self.settings_toggles.values():
                 button.update(mouse_pos)
-                button.draw(self.screen)
+                self.dirty.add(button.draw(self.screen))
             
             # Update sound volumes
             for sound in [self.jump_sound, self.point_sound, self.death_sound]:
@@ -679,39 +1719,27 @@ class Game:
             
             # Draw particles
             self.particles.update()
-            self.particles.draw(self.screen)
+            self.particles.draw(self.screen, self.dirty)
             
             # Draw key bindings preview
-            key_text = self.font.render("Press ESC to save and return", True, 
-                                      tuple(map(lambda x: x * (math.sin(current_time/500) * 0.2 + 0.8), WHITE)))
-            self.screen.blit(key_text, (SCREEN_WIDTH//2 - key_text.get_width()//2, SCREEN_HEIGHT - 50))
+            key_text = text_cache.render("Press ESC to save and return", True, 
+                                      tuple(map(lambda x: x * Utils.quantize(math.sin(current_time/500) * 0.2 + 0.8), WHITE)))
+            self.dirty.add(self.screen.blit(key_text, (SCREEN_WIDTH//2 - key_text.get_width()//2, SCREEN_HEIGHT - 50)))
             
-            pygame.display.flip()
-            self.clock.tick(FPS)
-
-    def shop_menu(self):
-        birds = {
-            "default": {"price": 0, "color": (255, 200, 31)},
-            "golden": {"price": 100, "color": (255, 215, 0)},
-            "rainbow": {"price": 500, "color": (255, 100, 100)},
-            "robot": {"price": 999, "color": (192, 192, 192)}
-        }
-        
-        obstacles = {
-            "default": {"price": 0, "color": PRIMARY},
-            "crystal": {"price": 150, "color": (173, 216, 230)},
-            "neon": {"price": 300, "color": (255, 110, 199)},
-            "gold": {"price": 750, "color": (255, 215, 0)}
-        }
+            self.present()
+            await self.wait_frame()
+
+    async def shop_menu(self):
+        birds = BIRD_SKINS
+        obstacles = OBSTACLE_STYLES
+        self.dirty.invalidate()
 
         while self.state == "shop":
             mouse_pos = pygame.mouse.get_pos()
             
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    self.settings.save()
-                    pygame.quit()
-                    sys.exit()
+                    self.quit()
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         self.state = "menu"
@@ -726,6 +1754,9 @@ class Game:
                                 self.settings.coins -= info["price"]
                                 self.settings.unlocked_birds.append(bird)
                                 self.point_sound.play()
+                            # Owned skins are equipped on click
+                            if bird in self.settings.unlocked_birds:
+                                self.settings.current_bird = bird
                         y += 70
 
                     # Handle obstacle purchases
@@ -742,16 +1773,16 @@ class Game:
             self.draw_background()
             
             # Draw title
-            title = self.font.render("Shop", True, WHITE)
+            title = text_cache.render("Shop", True, WHITE)
             title_rect = title.get_rect(center=(SCREEN_WIDTH//2, 50))
             self.screen.blit(title, title_rect)
             
             # Draw coins
-            coins_text = self.font.render(f"Coins: ${self.settings.coins}", True, WHITE)
-            self.screen.blit(coins_text, (20, 20))
+            coins_text = text_cache.render(f"Coins: ${self.settings.coins}", True, WHITE)
+            self.dirty.add(self.screen.blit(coins_text, (20, 20)))
             
             # Draw bird section
-            birds_title = self.font.render("Bird Skins", True, WHITE)
+            birds_title = text_cache.render("Bird Skins", True, WHITE)
             self.screen.blit(birds_title, (SCREEN_WIDTH//4 - birds_title.get_width()//2, 100))
             
             y = 150
@@ -767,8 +1798,9 @@ class Game:
                     rect,
                     10
                 )
+                self.dirty.add(rect)
                 
-                text = self.font.render(
+                text = text_cache.render(
                     bird.capitalize() if unlocked else f"${price}",
                     True,
                     WHITE
@@ -778,7 +1810,7 @@ class Game:
                 y += 70
             
             # Draw obstacles section
-            obs_title = self.font.render("Obstacle Styles", True, WHITE)
+            obs_title = text_cache.render("Obstacle Styles", True, WHITE)
             self.screen.blit(obs_title, (3*SCREEN_WIDTH//4 - obs_title.get_width()//2, 100))
             
             y = 150
@@ -794,8 +1826,9 @@ class Game:
                     rect,
                     10
                 )
+                self.dirty.add(rect)
                 
-                text = self.font.render(
+                text = text_cache.render(
                     obs.capitalize() if unlocked else f"${price}",
                     True,
                     WHITE
@@ -804,29 +1837,95 @@ class Game:
                 self.screen.blit(text, text_rect)
                 y += 70
             
-            pygame.display.flip()
-            self.clock.tick(FPS)
+            self.present()
+            await self.wait_frame()
+
+    async def leaderboard_screen(self):
+        # Queries run when the screen opens and when the difficulty tab
+        # changes, never per frame
+        history = self.run_history
+        history.flush()  # include the run that just ended
+        difficulties = list(DIFFICULTY_SETTINGS)
+        tabs = [Button(SCREEN_WIDTH//2 - 330 + i * 230, 150, 200, 45, name.capitalize())
+                for i, name in enumerate(difficulties)]
+        selected = self.settings.difficulty
+        lines = None
+        self.dirty.invalidate()
+
+        while self.state == "leaderboard":
+            mouse_pos = pygame.mouse.get_pos()
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.quit()
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        self.state = "menu"
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    if self.close_button.rect.collidepoint(mouse_pos):
+                        self.state = 'menu'
+                        if hasattr(self, 'ui_click') and self.ui_click:
+                            self.ui_click.play()
+                    for name, tab in zip(difficulties, tabs):
+                        if tab.rect.collidepoint(mouse_pos) and name != selected:
+                            selected = name
+                            lines = None
+                            if hasattr(self, 'ui_click') and self.ui_click:
+                                self.ui_click.play()
+
+            if lines is None:
+                summary = history.summary(selected)
+                if summary is None:
+                    lines = [("No runs yet - go set a score!", WHITE)]
+                else:
+                    lines = [(f"{summary['runs']} runs   best {summary['best']}   "
+                              f"average {summary['total_score'] / summary['runs']:.1f}   "
+                              f"median {history.score_at_percentile(selected, 50)}   "
+                              f"top 10% {history.score_at_percentile(selected, 90)}", ACCENT_SECONDARY)]
+                    for rank, run in enumerate(history.top(selected, 10), 1):
+                        played = datetime.fromtimestamp(run['played_at']).strftime("%Y-%m-%d %H:%M")
+                        lines.append((f"{rank:>2}.  {run['score']:>5}   combo x{run['max_combo']}   "
+                                      f"perfect {run['perfect_passes']}   {played}",
+                                      GOLD if rank == 1 else WHITE))
+                for name, tab in zip(difficulties, tabs):
+                    tab.color = ACCENT if name == selected else PRIMARY
+
+            self.draw_background()
+
+            title = text_cache.render("Leaderboard", True, WHITE, 48)
+            self.dirty.add(self.screen.blit(title, title.get_rect(center=(SCREEN_WIDTH//2, 80))))
+
+            for tab in tabs:
+                tab.update(mouse_pos)
+                self.dirty.add(tab.draw(self.screen))
+
+            # Summary line, then the top runs
+            for i, (text, color) in enumerate(lines):
+                line = text_cache.render(text, True, color, 30 if i == 0 else 32)
+                y = 240 if i == 0 else 250 + i * 38
+                self.dirty.add(self.screen.blit(line, line.get_rect(center=(SCREEN_WIDTH//2, y))))
 
-    def credits_screen(self):
+            self.close_button.update(mouse_pos)
+            self.dirty.add(self.close_button.draw(self.screen))
+
+            self.present()
+            await self.wait_frame()
+
+    async def credits_screen(self):
         credits = [
             {"name": "Daffa Aditya Pratama", "role": "Lead Developer"},
             {"name": "Samsul Bahrur", "role": "Game Designer"}
         ]
-        
-        title_font = pygame.font.Font(None, 48)
-        credit_font = pygame.font.Font(None, 36)
-        role_font = pygame.font.Font(None, 24)
+        self.dirty.invalidate()
         
         while self.state == "credits":
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    self.quit()
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         self.state = "menu"
                 if event.type == pygame.MOUSEBUTTONDOWN:
-                    if hasattr(self, 'close_button') and self.close_button.rect.collidepoint(pygame.mouse.get_pos()):
+                    if self.close_button.rect.collidepoint(pygame.mouse.get_pos()):
                         self.state = 'menu'
                         if hasattr(self, 'ui_click') and self.ui_click:
                             self.ui_click.play()
@@ -834,7 +1933,7 @@ class Game:
             self.draw_background()
             
             # Draw title
-            title = title_font.render("Credits", True, WHITE)
+            title = text_cache.render("Credits", True, WHITE, 48)
             title_rect = title.get_rect(center=(SCREEN_WIDTH//2, 100))
             self.screen.blit(title, title_rect)
             
@@ -845,497 +1944,434 @@ class Game:
                 y_pos = 250 + i * 100 + y_offset
                 
                 # Draw name
-                name_text = credit_font.render(credit["name"], True, WHITE)
+                name_text = text_cache.render(credit["name"], True, WHITE, 36)
                 name_rect = name_text.get_rect(center=(SCREEN_WIDTH//2, y_pos))
-                self.screen.blit(name_text, name_rect)
+                self.dirty.add(self.screen.blit(name_text, name_rect))
                 
                 # Draw role
-                role_text = role_font.render(credit["role"], True, SECONDARY)
+                role_text = text_cache.render(credit["role"], True, SECONDARY, 24)
                 role_rect = role_text.get_rect(center=(SCREEN_WIDTH//2, y_pos + 30))
-                self.screen.blit(role_text, role_rect)
+                self.dirty.add(self.screen.blit(role_text, role_rect))
             
             # Draw close button
-            if hasattr(self, 'close_button'):
-                self.close_button.update(pygame.mouse.get_pos())
-                self.close_button.draw(self.screen)
+            self.close_button.update(pygame.mouse.get_pos())
+            self.dirty.add(self.close_button.draw(self.screen))
             
-            pygame.display.flip()
-            self.clock.tick(FPS)
+            self.present()
+            await self.wait_frame()
 
-    def play_game(self):
-        # Get difficulty settings
-        diff_settings = DIFFICULTY_SETTINGS[self.settings.difficulty]
-        
-        # Initialize game state
-        game_over = False
-        
-        # Initialize game variables with difficulty settings
-        bird_y = SCREEN_HEIGHT // 2
-        bird_velocity = 0
-        gravity = diff_settings["gravity"]
-        jump_strength = diff_settings["jump_strength"]
-        pipe_gap = diff_settings["pipe_gap"]
-        pipe_width = 70
-        pipe_speed = diff_settings["initial_speed"]
-        score_multiplier = diff_settings["score_multiplier"]
-        pipes = []
-        score = 0
-        combo = 0
-        perfect_passes = 0
-        screen_shake = 0
-        rainbow_effect = 0
-        angle = 0
-        invincibility_frames = 0  # Number of frames of invincibility left
-        collisions = 0  # Number of collisions before game over
-        max_collisions = 1  # Number of hits player can take before game over
-        
-        # Background particles
-        self.particles.particles.clear()  # Reset particles
-        last_particle_time = 0
-        particle_interval = 100  # milliseconds
-        
-        # Game stats for this session
-        stats = {
-            'perfect_passes': 0,
-            'near_misses': 0,
-            'max_combo': 0,
-            'total_coins': 0
-        }
-        
+    def spawn_burst(self, x, y, color, count, speed_range, lifetime=30, angle_range=(0, 2*math.pi)):
+        for _ in range(count):
+            angle = random.uniform(*angle_range)
+            speed = random.uniform(*speed_range)
+            self.particles.add_particle(
+                x, y,
+                color,
+                (speed * math.cos(angle), speed * math.sin(angle)),
+                lifetime
+            )
+
+    def handle_sim_event(self, state, event, value):
+        # Sounds and particles for gameplay events reported by simulation.step
+        bird_y = state.bird_y
+        if event == simulation.EVENT_JUMP:
+            try:
+                self.jump_sound.play()
+            except Exception:
+                pass
+            # Add jump particles
+            self.spawn_burst(100, bird_y, (*PRIMARY, 150), 5, (1, 3))
+
+        elif event == simulation.EVENT_HIT:
+            self.death_sound.play()
+            # Add dramatic multi-layered explosion particles
+            for color in [ACCENT, GOLD, WHITE]:
+                for _ in range(15):
+                    angle = random.uniform(0, 2*math.pi)
+                    speed = random.uniform(3, 7)
+                    self.particles.add_particle(
+                        100, bird_y,
+                        color,
+                        (speed * math.cos(angle), speed * math.sin(angle)),
+                        random.randint(40, 79)
+                    )
+            # Add secondary particles moving backwards for more dramatic effect
+            self.spawn_burst(100, bird_y, ACCENT_SECONDARY, 10, (-4, -2), 60,
+                             angle_range=(-math.pi/4, math.pi/4))
+            # Add screen shake effect
+            if self.settings.screen_shake:
+                self.screen_shake = 20
+
+        elif event == simulation.EVENT_CRASH:
+            self.death_sound.play()
+
+        elif event == simulation.EVENT_PERFECT:
+            self.spawn_burst(85, bird_y, GOLD, 15, (3, 7), 40)
+
+        elif event == simulation.EVENT_NEAR_MISS:
+            self.spawn_burst(85, bird_y, ACCENT_SECONDARY, 8, (2, 5), 30)
+
+        elif event == simulation.EVENT_SCORE:
+            # Replays show the run again without paying out a second time
+            if self.replay is None:
+                self.settings.coins += value
+            # Play sound with pitch variation based on combo
+            self.point_sound.set_volume(min(1.0, 0.5 + state.combo * 0.1))
+            self.point_sound.play()
+
+        elif event == simulation.EVENT_SPEED_UP:
+            # Add speed up effect
+            for _ in range(20):
+                self.particles.add_particle(
+                    random.randint(0, SCREEN_WIDTH),
+                    random.randint(0, SCREEN_HEIGHT),
+                    ACCENT,
+                    (random.uniform(-3, 3), random.uniform(-3, 3)),
+                    40
+                )
+
+    def draw_pipes(self, pipes, surface=None, x_shift=0, scale=1.0):
+        # x_shift offsets every pipe, e.g. to interpolate between two ticks;
+        # scale maps screen coordinates into a reduced-resolution buffer
+        surface = surface or self.screen
+        dirty = self.dirty if self.dirty.enabled else None
+        width = simulation.PIPE_WIDTH * scale
+        radius = max(1, int(5 * scale))
+        for pipe in pipes:
+            x = (pipe.x + x_shift) * scale
+            upper = (x, 0, width, pipe.gap_top * scale)
+            lower = (x, pipe.gap_bottom * scale, width, (SCREEN_HEIGHT - pipe.gap_bottom) * scale)
+            Utils.draw_rounded_rect(surface, PRIMARY, upper, radius)
+            Utils.draw_rounded_rect(surface, PRIMARY, lower, radius)
+            if dirty is not None:
+                dirty.add(upper)
+                dirty.add(lower)
+
+    def draw_hud(self, state):
+        score = state.score
+        combo = state.combo
+
+        # Score
+        score_color = GOLD if combo > 5 else WHITE
+        score_size = min(48, 36 + combo * 2)  # Score text grows with combo
+        score_text = text_cache.render(f'Score: {score}', True, score_color, score_size)
+        score_rect = score_text.get_rect(midtop=(SCREEN_WIDTH//2, 20))
+
+        # Add glow effect for high scores
+        if score > 50 and self.quality.current["overlay_effects"]:
+            glow_surf = score_text.copy()
+            glow_surf.fill((50, 50, 50, 0), special_flags=pygame.BLEND_RGBA_ADD)
+            self.dirty.add(self.screen.blit(glow_surf, (score_rect.x + 2, score_rect.y + 2)))
+
+        self.dirty.add(self.screen.blit(score_text, score_rect))
+
+        # Combo counter
+        if combo > 0:
+            combo_text = text_cache.render(f'Combo: x{combo}', True, ACCENT_SECONDARY)
+            combo_rect = combo_text.get_rect(midtop=(SCREEN_WIDTH//2, 60))
+            self.dirty.add(self.screen.blit(combo_text, combo_rect))
+
+        # Perfect passes
+        perfect_passes = state.stats['perfect_passes']
+        if perfect_passes > 0:
+            perfect_text = text_cache.render(f'Perfect: {perfect_passes}', True, GOLD)
+            self.dirty.add(self.screen.blit(perfect_text, (20, 20)))
+
+        # Coins with animation
+        coin_color = tuple(map(lambda x: x * Utils.quantize(math.sin(pygame.time.get_ticks()/200) * 0.2 + 0.8), GOLD))
+        coin_text = text_cache.render(f'${self.settings.coins}', True, coin_color)
+        coin_rect = coin_text.get_rect(topright=(SCREEN_WIDTH - 20, 20))
+
+        # Draw coin icon
+        coin_size = 24
+        self.dirty.add(pygame.draw.circle(self.screen, coin_color, (coin_rect.left - 15, coin_rect.centery), coin_size//2))
+        pygame.draw.circle(self.screen, (50, 50, 50), (coin_rect.left - 15, coin_rect.centery), coin_size//2, 2)
+
+        self.dirty.add(self.screen.blit(coin_text, coin_rect))
+
+        # Difficulty indicator
+        diff_text = text_cache.render(
+            f'{state.difficulty.capitalize()} Mode',
+            True,
+            PRIMARY
+        )
+        self.dirty.add(self.screen.blit(diff_text, (20, SCREEN_HEIGHT - 30)))
+
+        # Speed indicator
+        speed_text = text_cache.render(
+            f'Speed: {state.pipe_speed:.1f}x',
+            True,
+            ACCENT if state.pipe_speed > state.initial_speed * 1.5 else WHITE
+        )
+        self.dirty.add(self.screen.blit(speed_text, (SCREEN_WIDTH - 150, SCREEN_HEIGHT - 30)))
+
+    def draw_game_over(self, state, game_over_start_time):
+        overlay = self.game_over_overlay
+        if overlay is None or overlay.state is not state:
+            overlay = self.game_over_overlay = GameOverOverlay(state, self.settings.high_score)
+        overlay.draw(self.screen, pygame.time.get_ticks() - game_over_start_time,
+                     self.quality.current["overlay_effects"])
+        self.dirty.invalidate()
+
+        # Restart instructions with pulsing effect
+        pulse = (math.sin(pygame.time.get_ticks() / 300) + 1) / 2
+        restart_color = tuple(map(lambda x: int(x * Utils.quantize(0.7 + 0.3 * pulse)), WHITE))
+        restart_text = text_cache.render('Press ESC to return to menu', True, restart_color)
+        self.screen.blit(restart_text, restart_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - 100)))
+
+        # Add floating particles for visual effect
+        if random.random() < 0.1:
+            self.particles.add_particle(
+                random.randint(0, SCREEN_WIDTH),
+                SCREEN_HEIGHT,
+                PRIMARY,
+                (random.uniform(-1, 1), random.uniform(-3, -1)),
+                random.randint(60, 120)
+            )
+
+    async def play_game(self):
+        # All gameplay rules live in simulation.py; this loop only feeds it
+        # input, turns its events into sounds/particles and renders the state.
+        # The simulation advances in fixed ticks from an accumulator of real
+        # time; frames render at their own rate and interpolate between the
+        # last two ticks.
+        replay = self.replay
+        ghost = None
+        if replay is not None:
+            state = replay.new_state()
+            recorder = ghost_recorder = None
+        else:
+            # Racing the best run's ghost means flying its course, so reuse its seed
+            if self.settings.ghost_racing:
+                ghost = GhostTrack.open(self.settings.difficulty, (SCREEN_WIDTH, SCREEN_HEIGHT))
+            state = simulation.GameState(
+                self.settings.difficulty,
+                seed=ghost.seed if ghost is not None else random.getrandbits(32),
+                width=SCREEN_WIDTH,
+                height=SCREEN_HEIGHT
+            )
+            recorder = ReplayRecorder(state)
+            ghost_recorder = GhostRecorder(state)
+        self.screen_shake = 0
         game_over_start_time = 0
-        last_speed_increase = pygame.time.get_ticks()
-        start_time = pygame.time.get_ticks()
-        
-        # Create helper function for pipe creation
-        def create_pipe(x_pos):
-            return {
-                'x': x_pos,
-                'height': np.random.randint(100, SCREEN_HEIGHT - pipe_gap - 100),
-                'passed': False,
-                'color': PRIMARY,
-                'particles': []
-            }
-        
-        # Initial pipe
-        pipes.append(create_pipe(SCREEN_WIDTH))
+        self.particles.clear()  # Reset particles
+        self.bird_sprites.prebuild(self.settings.current_bird)
+        profiler = self.profiler
+        compositor = self.compositor
+        quality = self.quality
+        quality.enabled = self.settings.adaptive_quality
+        quality.dynamic_resolution = self.settings.dynamic_resolution
+        self.prebuild_backgrounds()
+        self.particles.set_limit(quality.current["max_particles"])
+        self.dirty.invalidate()
+
+        tick_seconds = 1 / simulation.TICK_RATE
+        accumulator = 0.0
+        previous_time = time.perf_counter()
+        pending_inputs = 0
+        # Bird pose and pipe scroll of the last tick, for interpolation
+        previous_y, previous_angle = state.bird_y, state.angle
+        scroll = 0
 
         while self.state == "playing":
-            mouse_pos = pygame.mouse.get_pos()
-            
+            profiler.begin_frame()
+            now = time.perf_counter()
+            accumulator += now - previous_time
+            previous_time = now
+            inputs = 0
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    self.settings.save()
-                    pygame.quit()
-                    sys.exit()
+                    self.save_replay(recorder, state)
+                    self.quit()
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         self.state = "menu"
                         # Save settings and clean up when exiting
                         self.settings.save()
-                        self.particles.particles.clear()
-
-                # Centralized jump handler to support keyboard, mouse and touch
-                def do_jump():
-                    nonlocal bird_velocity, bird_y
-                    bird_velocity = jump_strength
-                    try:
-                        self.jump_sound.play()
-                    except Exception:
-                        pass
-                    # Add jump particles
-                    for _ in range(5):
-                        angle = random.uniform(0, 2*math.pi)
-                        speed = random.uniform(1, 3)
-                        self.particles.add_particle(
-                            100, bird_y,
-                            (*PRIMARY, 150),
-                            (speed * math.cos(angle), speed * math.sin(angle))
-                        )
-
-                # Keyboard jump
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE and not game_over:
-                    do_jump()
-
-                # Mouse click (desktop/web) jump
-                if event.type == pygame.MOUSEBUTTONDOWN and not game_over:
-                    # Accept left click or touch-simulated mouse click
-                    do_jump()
-
-                # Touch event on Android (FINGERDOWN)
-                if event.type == pygame.FINGERDOWN and not game_over:
-                    # Convert normalized touch coords to screen coords if needed
-                    try:
-                        tx = int(event.x * SCREEN_WIDTH)
-                        ty = int(event.y * SCREEN_HEIGHT)
-                    except Exception:
-                        tx, ty = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
-                    do_jump()
-
-            if not game_over:
-                # Update bird position and angle
-                bird_velocity += gravity
-                bird_y += bird_velocity
-                angle = np.clip(bird_velocity * 3, -45, 45)
-                
-                # Update pipes
-                for pipe in pipes:
-                    pipe['x'] -= pipe_speed
-
-                # Remove off-screen pipes
-                pipes = [pipe for pipe in pipes if pipe['x'] > -pipe_width]
-
-                # Add new pipes
-                if pipes[-1]['x'] < SCREEN_WIDTH - 300:
-                    pipes.append(create_pipe(SCREEN_WIDTH))
-
-                # Check collisions and score
-                bird_rect = pygame.Rect(85, bird_y, 30, 30)
-                for pipe in pipes:
-                    upper_pipe = pygame.Rect(pipe['x'], 0, pipe_width, pipe['height'])
-                    lower_pipe = pygame.Rect(pipe['x'], pipe['height'] + pipe_gap, 
-                                          pipe_width, SCREEN_HEIGHT)
-                    if (bird_rect.colliderect(upper_pipe) or bird_rect.colliderect(lower_pipe)) and invincibility_frames <= 0:
-                        collisions += 1
-                        if collisions >= max_collisions:
-                            game_over = True
-                            game_over_start_time = pygame.time.get_ticks()
-                        self.death_sound.play()
-                        
-                        # Add dramatic multi-layered explosion particles
-                        colors = [ACCENT, GOLD, WHITE]
-                        for color in colors:
-                            for _ in range(15):
-                                angle = np.random.uniform(0, 2*np.pi)
-                                speed = np.random.uniform(3, 7)
-                                lifetime = np.random.randint(40, 80)
-                                self.particles.add_particle(
-                                    100, bird_y,
-                                    color,
-                                    (speed * np.cos(angle), speed * np.sin(angle)),
-                                    lifetime
-                                )
-                                
-                        # Add secondary particles for more dramatic effect
-                        for _ in range(10):
-                            angle = np.random.uniform(-np.pi/4, np.pi/4)  # Focused direction
-                            speed = np.random.uniform(2, 4)
-                            self.particles.add_particle(
-                                100, bird_y,
-                                ACCENT_SECONDARY,
-                                (-speed * np.cos(angle), -speed * np.sin(angle)),  # Moving backwards
-                                60
-                            )
-                            
-                        # Add screen shake effect
-                        if self.settings.screen_shake:
-                            screen_shake = 20  # Will be used in screen rendering
-                            
-                        # Grant invincibility frames
-                        invincibility_frames = 60  # 1 second at 60 FPS
-                    
-                    # Score point if passing pipe
-                    if not pipe['passed'] and pipe['x'] < 85:
-                        pipe['passed'] = True
-                        score += 1 * score_multiplier
-                        
-                        # Calculate center-line deviation for perfect pass bonus
-                        pipe_center = pipe['height'] + pipe_gap / 2
-                        bird_center = bird_y + 15
-                        deviation = abs(bird_center - pipe_center)
-                        
-                        # Perfect pass bonus (within 10 pixels of center)
-                        if deviation < 10:
-                            score += 2 * score_multiplier
-                            combo += 1
-                            perfect_passes += 1
-                            stats['perfect_passes'] += 1
-                            # Add sparkle effect
-                            for _ in range(15):
-                                angle = random.uniform(0, 2*math.pi)
-                                speed = random.uniform(3, 7)
-                                self.particles.add_particle(
-                                    85, bird_y,
-                                    GOLD,
-                                    (speed * math.cos(angle), speed * math.sin(angle)),
-                                    40
-                                )
-                        # Near miss bonus (within 30 pixels of center)
-                        elif deviation < 30:
-                            score += 1 * score_multiplier
-                            combo += 1
-                            stats['near_misses'] += 1
-                            # Add smaller sparkle effect
-                            for _ in range(8):
-                                angle = random.uniform(0, 2*math.pi)
-                                speed = random.uniform(2, 5)
-                                self.particles.add_particle(
-                                    85, bird_y,
-                                    ACCENT_SECONDARY,
-                                    (speed * math.cos(angle), speed * math.sin(angle)),
-                                    30
-                                )
-                        else:
-                            combo = 0
-                        
-                        # Update max combo
-                        stats['max_combo'] = max(stats['max_combo'], combo)
-                        
-                        # Award coins based on performance
-                        coin_bonus = (1 + (combo // 3)) * score_multiplier
-                        self.settings.coins += coin_bonus
-                        stats['total_coins'] += coin_bonus
-                        
-                        # Play sound with pitch variation based on combo
-                        self.point_sound.set_volume(min(1.0, 0.5 + combo * 0.1))
-                        self.point_sound.play()
-                        
-                        # Speed increase every 10 points with visual feedback
-                        if score % 10 == 0:
-                            pipe_speed += diff_settings["speed_increment"]
-                            # Add speed up effect
-                            for _ in range(20):
-                                self.particles.add_particle(
-                                    random.randint(0, SCREEN_WIDTH),
-                                    random.randint(0, SCREEN_HEIGHT),
-                                    ACCENT,
-                                    (random.uniform(-3, 3), random.uniform(-3, 3)),
-                                    40
-                                )
+                        self.particles.clear()
+                    elif event.key == pygame.K_F3:
+                        self.settings.debug_overlay = not self.settings.debug_overlay
+                    elif event.key == pygame.K_F12:
+                        try:
+                            logger.info("Frame profile written to %s.csv/.json", profiler.export())
+                        except OSError:
+                            pass
 
-                # Check if bird hits boundaries
-                if bird_y < 0 or bird_y > SCREEN_HEIGHT:
-                    game_over = True
-                    self.death_sound.play()
-
-            # Draw game with screen shake effect
-            shake_offset = (0, 0)
-            if screen_shake > 0 and self.settings.screen_shake:
-                shake_offset = (
-                    random.randint(-screen_shake, screen_shake),
-                    random.randint(-screen_shake, screen_shake)
-                )
-                screen_shake = max(0, screen_shake - 1)
-                
-            # Create a temporary surface for shake effect
-            if shake_offset != (0, 0):
-                temp_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-                draw_surface = temp_surface
-            else:
-                draw_surface = self.screen
-            
-            # Draw on the appropriate surface
-            self.draw_background()
-            
-            # Update and draw particles
-            self.particles.update()
-            self.particles.draw(draw_surface)
-            
-            # Draw pipes with gradient effect
-            for pipe in pipes:
-                # Upper pipe
-                Utils.draw_rounded_rect(
-                    self.screen,
-                    PRIMARY,
-                    (pipe['x'], 0, pipe_width, pipe['height']),
-                    5
-                )
-                # Lower pipe
-                Utils.draw_rounded_rect(
-                    self.screen,
-                    PRIMARY,
-                    (pipe['x'], pipe['height'] + pipe_gap, 
-                     pipe_width, SCREEN_HEIGHT - (pipe['height'] + pipe_gap)),
-                    5
-                )
+                # Jump from keyboard, mouse click (desktop/web) or touch (Android FINGERDOWN)
+                if not state.game_over and (
+                        (event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE) or
+                        event.type == pygame.MOUSEBUTTONDOWN or
+                        event.type == pygame.FINGERDOWN):
+                    inputs |= simulation.INPUT_JUMP
+
+            profiler.mark("events")
+
+            # Inputs from this frame go to the next tick, even if the frame
+            # is too short to run one
+            pending_inputs |= inputs
+            ticks = 0
+            while accumulator >= tick_seconds:
+                if ticks == self.settings.max_catch_up:
+                    # Long hitch: drop the backlog rather than spiral trying
+                    # to catch up
+                    accumulator %= tick_seconds
+                    break
+                if replay is not None:
+                    if state.tick >= replay.total_ticks and not state.game_over:
+                        # The recording stops here (the player quit mid-run);
+                        # stepping on would invent a crash that never happened
+                        self.state = "menu"
+                        self.particles.clear()
+                        break
+                    inputs = replay.inputs_at(state.tick)
+                else:
+                    inputs = pending_inputs
+                    if not state.game_over:
+                        recorder.record(state, inputs)
+                pending_inputs = 0
+
+                was_over = state.game_over
+                previous_y, previous_angle = state.bird_y, state.angle
+                scroll = 0 if was_over else state.pipe_speed
+                for event, value in simulation.step(state, inputs):
+                    self.handle_sim_event(state, event, value)
+                if ghost_recorder is not None and not was_over:
+                    ghost_recorder.record(state)
+                if state.game_over and not was_over:
+                    game_over_start_time = pygame.time.get_ticks()
+                    # Pre-render the results screen before the high score changes
+                    self.game_over_overlay = GameOverOverlay(state, self.settings.high_score)
+                    self.save_replay(recorder, state)
+                    if recorder is not None:
+                        self.run_history.record(state.difficulty, state.seed, state.score,
+                                                state.tick, state.stats)
+                    if ghost is not None:
+                        ghost.close()
+                        ghost = None
+                    self.save_ghost(ghost_recorder, state)
+
+                self.particles.update()
+                self.screen_shake = max(0, self.screen_shake - 1)
+                accumulator -= tick_seconds
+                ticks += 1
+            alpha = accumulator / tick_seconds
+            profiler.mark("simulation")
+
+            # Screen shake moves the camera; the world layers render at the
+            # governor's current resolution
+            camera_x = camera_y = 0
+            if self.screen_shake > 0 and self.settings.screen_shake:
+                camera_x = random.randint(-self.screen_shake, self.screen_shake)
+                camera_y = random.randint(-self.screen_shake, self.screen_shake)
+            compositor.camera = (camera_x, camera_y)
+            scale = compositor.scale = quality.render_scale
+            world = compositor.world(self.screen)
+
+            self.draw_background(world, scale)
+            profiler.mark("background")
+
+            # Draw particles (updated per tick above)
+            self.particles.draw(world, self.dirty, scale)
+            profiler.mark("particles")
+
+            # Draw pipes where they were `alpha` of the way from the previous
+            # tick to the current one
+            self.draw_pipes(state.pipes, world, scroll * (1 - alpha), scale)
+            profiler.mark("pipes")
 
-            # Update and draw bird
-            if invincibility_frames > 0:
-                invincibility_frames -= 1
-            self.draw_bird(100, bird_y, angle, invincibility_frames)
+            # Put the world on screen through the camera; the bird follows the
+            # camera at native resolution and the HUD stays put
+            if world is not self.screen:
+                compositor.compose(world, self.screen)
+                self.dirty.invalidate()
+                profiler.mark("compose")
+
+            # The ghost is interpolated between ticks like the bird, under it
+            if ghost is not None:
+                pose = ghost.pose(state.tick)
+                if pose is not None:
+                    ghost_previous = ghost.pose(state.tick - 1) or pose
+                    self.draw_bird(100 + camera_x,
+                                   ghost_previous[0] + (pose[0] - ghost_previous[0]) * alpha + camera_y,
+                                   ghost_previous[1] + (pose[1] - ghost_previous[1]) * alpha,
+                                   alpha=GHOST_ALPHA)
+
+            self.draw_bird(100 + camera_x, previous_y + (state.bird_y - previous_y) * alpha + camera_y,
+                           previous_angle + (state.angle - previous_angle) * alpha,
+                           state.invincibility_ticks)
+            profiler.mark("bird")
 
             # Draw score UI with enhanced visuals
-            # Score
-            score_color = GOLD if combo > 5 else WHITE
-            score_size = min(48, 36 + combo * 2)  # Score text grows with combo
-            score_font = pygame.font.Font(None, score_size)
-            score_text = score_font.render(f'Score: {score}', True, score_color)
-            score_rect = score_text.get_rect(midtop=(SCREEN_WIDTH//2, 20))
-            
-            # Add glow effect for high scores
-            if score > 50:
-                glow_surf = score_text.copy()
-                glow_surf.fill((50, 50, 50, 0), special_flags=pygame.BLEND_RGBA_ADD)
-                self.screen.blit(glow_surf, (score_rect.x + 2, score_rect.y + 2))
-            
-            self.screen.blit(score_text, score_rect)
-            
-            # Combo counter
-            if combo > 0:
-                combo_text = self.font.render(f'Combo: x{combo}', True, ACCENT_SECONDARY)
-                combo_rect = combo_text.get_rect(midtop=(SCREEN_WIDTH//2, 60))
-                self.screen.blit(combo_text, combo_rect)
-            
-            # Perfect passes
-            if perfect_passes > 0:
-                perfect_text = self.font.render(f'Perfect: {perfect_passes}', True, GOLD)
-                self.screen.blit(perfect_text, (20, 20))
-            
-            # Coins with animation
-            coin_color = tuple(map(lambda x: x * (math.sin(pygame.time.get_ticks()/200) * 0.2 + 0.8), GOLD))
-            coin_text = self.font.render(f'${self.settings.coins}', True, coin_color)
-            coin_rect = coin_text.get_rect(topright=(SCREEN_WIDTH - 20, 20))
-            
-            # Draw coin icon
-            coin_size = 24
-            pygame.draw.circle(self.screen, coin_color, (coin_rect.left - 15, coin_rect.centery), coin_size//2)
-            pygame.draw.circle(self.screen, (50, 50, 50), (coin_rect.left - 15, coin_rect.centery), coin_size//2, 2)
-            
-            self.screen.blit(coin_text, coin_rect)
-            
-            # Difficulty indicator
-            diff_text = self.font.render(
-                f'{self.settings.difficulty.capitalize()} Mode', 
-                True, 
-                PRIMARY
-            )
-            self.screen.blit(diff_text, (20, SCREEN_HEIGHT - 30))
-            
-            # Speed indicator
-            speed_text = self.font.render(
-                f'Speed: {pipe_speed:.1f}x', 
-                True, 
-                ACCENT if pipe_speed > diff_settings["initial_speed"] * 1.5 else WHITE
-            )
-            self.screen.blit(speed_text, (SCREEN_WIDTH - 150, SCREEN_HEIGHT - 30))
+            self.draw_hud(state)
+            profiler.mark("hud")
 
-            if game_over:
+            if state.game_over:
                 # Update high score
-                if score > self.settings.high_score:
-                    self.settings.high_score = score
+                if replay is None and state.score > self.settings.high_score:
+                    self.settings.high_score = state.score
                     self.settings.save()
-                
-                # Create dynamic overlay with gradient and pulse effect
-                current_time = pygame.time.get_ticks()
-                time_since_game_over = current_time - game_over_start_time
-                fade_progress = min(1.0, time_since_game_over / 1000)  # Complete fade in 1 second
-                
-                # Create gradient overlay
-                overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-                gradient_colors = [
-                    (0, 0, 0, int(192 * fade_progress)),  # Dark at top
-                    (ACCENT[0], ACCENT[1], ACCENT[2], int(64 * fade_progress)),  # Accent color in middle
-                    (0, 0, 0, int(192 * fade_progress))   # Dark at bottom
-                ]
-                
-                gradient_height = SCREEN_HEIGHT // len(gradient_colors)
-                for i in range(len(gradient_colors) - 1):
-                    start_color = gradient_colors[i]
-                    end_color = gradient_colors[i + 1]
-                    for y in range(gradient_height):
-                        progress = y / gradient_height
-                        color = tuple(int(start + (end - start) * progress) 
-                                   for start, end in zip(start_color, end_color))
-                        pygame.draw.line(overlay, color, 
-                                       (0, i * gradient_height + y),
-                                       (SCREEN_WIDTH, i * gradient_height + y))
-                
-                # Add pulse effect
-                pulse = (math.sin(current_time / 300) + 1) / 2
-                pulse_overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-                pulse_alpha = int(32 * pulse * fade_progress)
-                pulse_overlay.fill((ACCENT[0], ACCENT[1], ACCENT[2], pulse_alpha))
-                
-                # Apply overlays
-                self.screen.blit(overlay, (0, 0))
-                self.screen.blit(pulse_overlay, (0, 0))
-                
-                # Calculate time-based animations
-                time_since_game_over = pygame.time.get_ticks() - game_over_start_time
-                fade_in_duration = 1000  # ms
-                text_delay = 500  # ms between each stat appearing
-                fade_progress = min(1.0, time_since_game_over / fade_in_duration)
-                
-                # Create larger font for game over text with animation
-                large_font = pygame.font.Font(None, 72)
-                game_over_text = large_font.render('Game Over!', True, WHITE)
-                game_over_rect = game_over_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 120))
-                
-                # Dramatic entrance animation for game over text
-                if time_since_game_over < fade_in_duration:
-                    scale = 1.5 - (0.5 * fade_progress)
-                    offset_y = -50 * (1 - fade_progress)
-                    scaled_text = pygame.transform.scale(
-                        game_over_text,
-                        (int(game_over_text.get_width() * scale),
-                         int(game_over_text.get_height() * scale))
-                    )
-                    scaled_rect = scaled_text.get_rect(center=(SCREEN_WIDTH//2, game_over_rect.centery + offset_y))
-                    game_over_rect = scaled_rect
-                    game_over_text = scaled_text
-                
-                # Add pulsing glow effect to game over text
-                pulse = (math.sin(time_since_game_over / 200) + 1) / 2
-                glow_color = tuple(map(lambda x: int(x * pulse), ACCENT))
-                glow_surf = game_over_text.copy()
-                glow_surf.fill((*glow_color, 0), special_flags=pygame.BLEND_RGBA_ADD)
-                
-                # Apply glow and draw text
-                self.screen.blit(glow_surf, (game_over_rect.x + 2, game_over_rect.y + 2))
-                self.screen.blit(game_over_text, game_over_rect)
-                
-                # Stats display with sequential animations
-                stats_data = [
-                    {'text': f'Final Score: {score}', 
-                     'color': GOLD if score > self.settings.high_score else WHITE},
-                    {'text': f'High Score: {self.settings.high_score}', 'color': GOLD},
-                    {'text': f'Perfect Passes: {stats["perfect_passes"]}', 'color': ACCENT_SECONDARY},
-                    {'text': f'Max Combo: x{stats["max_combo"]}', 'color': PRIMARY},
-                    {'text': f'Coins Earned: ${stats["total_coins"]}', 'color': GOLD}
-                ]
-                
-                stats_y = SCREEN_HEIGHT//2 - 40
-                stats_spacing = 40
-                
-                for i, stat in enumerate(stats_data):
-                    # Calculate individual stat timing
-                    stat_delay = text_delay * (i + 1)
-                    if time_since_game_over > stat_delay:
-                        stat_progress = min(1.0, (time_since_game_over - stat_delay) / 500)
-                        
-                        # Create sliding and fading animation
-                        x_offset = (1 - stat_progress) * 100
-                        alpha = int(255 * stat_progress)
-                        
-                        # Create text surface with alpha
-                        text_surface = self.font.render(stat['text'], True, stat['color'])
-                        alpha_surface = pygame.Surface(text_surface.get_size(), pygame.SRCALPHA)
-                        alpha_surface.fill((255, 255, 255, alpha))
-                        text_surface.blit(alpha_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-                        
-                        # Position and draw text
-                        text_rect = text_surface.get_rect(
-                            center=(SCREEN_WIDTH//2 + x_offset, stats_y + stats_spacing * i)
-                        )
-                        self.screen.blit(text_surface, text_rect)
-                
-                # Restart instructions with pulsing effect
-                pulse = (math.sin(pygame.time.get_ticks() / 300) + 1) / 2
-                restart_color = tuple(map(lambda x: int(x * (0.7 + 0.3 * pulse)), WHITE))
-                restart_text = self.font.render('Press ESC to return to menu', True, restart_color)
-                self.screen.blit(restart_text, restart_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - 100)))
-                
-                # Add floating particles for visual effect
-                if random.random() < 0.1:
-                    self.particles.add_particle(
-                        random.randint(0, SCREEN_WIDTH),
-                        SCREEN_HEIGHT,
-                        PRIMARY,
-                        (random.uniform(-1, 1), random.uniform(-3, -1)),
-                        random.randint(60, 120)
-                    )
+                self.draw_game_over(state, game_over_start_time)
+            profiler.mark("overlay")
 
-            pygame.display.flip()
-            self.clock.tick(FPS)
+            # Frame profiler HUD (counted as HUD time)
+            if self.settings.debug_overlay:
+                profiler_rect = profiler.draw(self.screen, SCREEN_WIDTH - FrameProfiler.GRAPH_WIDTH - 20, 60)
+                quality_text = text_cache.render(f"quality {quality.name}  scale {scale:.2f}x", True, WHITE, 20)
+                self.dirty.add(profiler_rect.union(
+                    self.screen.blit(quality_text, (profiler_rect.x, profiler_rect.bottom + 4))))
+                profiler.mark("hud")
+
+            # The governor sees the frame's own work: the flip can block on
+            # vsync for a whole refresh, which is not load it can shed
+            work_ms = (time.perf_counter() - now) * 1000
+            self.present()
+            profiler.mark("flip")
+            decision = quality.update(work_ms)
+            if decision is not None:
+                self.particles.set_limit(quality.current["max_particles"])
+                logger.debug("Quality: %s -> %s (%s, %.1f ms/frame)", decision['from'], decision['to'],
+                             decision['reason'], decision['average_ms'])
+            await self.wait_frame(self.settings.max_fps)
+            profiler.mark("tick_wait")
+            profiler.end_frame()
+
+        if not state.game_over:
+            self.save_replay(recorder, state)
+        if ghost is not None:
+            ghost.close()
+        self.replay = None
+        self.game_over_overlay = None
+
+    def save_ghost(self, ghost_recorder, state):
+        # Encode now, compare and write on the file writer
+        if ghost_recorder is None:
+            return
+        self.file_writer.submit(self._write_ghost, state.difficulty, (state.width, state.height),
+                                state.score, ghost_recorder.to_bytes(state.score))
+
+    @staticmethod
+    def _write_ghost(difficulty, size, score, data):
+        # Keep the run as the difficulty's ghost if it beats the stored one;
+        # a ghost for another screen size cannot be raced here, so it yields
+        best = GhostTrack.best_score(difficulty, size)
+        if best is None or score > best:
+            try:
+                GhostRecorder.write(difficulty, data)
+            except OSError:
+                pass
+
+    def save_replay(self, recorder, state):
+        # Keep the most recent run so bug reports can be reproduced exactly
+        if recorder is None:
+            return
+        self.file_writer.submit(self._write_replay, recorder.finish(state).to_bytes())
+
+    @staticmethod
+    def _write_replay(data):
+        try:
+            Replay.write(os.path.join('replays', 'last_run.replay'), data)
+        except OSError:
+            pass
 
 if __name__ == "__main__":
     game = Game()
@@ -0,0 +1,246 @@
+"""
+Compact replay recording and playback for Modern Flappy Bird
+A replay stores the RNG seed, difficulty parameters, the delta-encoded ticks
+at which the player jumped, and periodic state keyframes so playback can
+seek to any tick by re-simulating at most one keyframe interval.
+
+Run: python replay.py replays/last_run.replay [--seek TICK] [--render]
+"""
+import argparse
+import bisect
+import os
+import struct
+import sys
+
+import simulation
+
+MAGIC = b"FBRP"
+VERSION = 1
+KEYFRAME_INTERVAL = 300  # ticks (5 seconds at 60 ticks per second)
+
+PARAM_NAMES = ("gravity", "jump_strength", "initial_speed", "speed_increment",
+               "pipe_gap", "score_multiplier")
+_HEADER = struct.Struct("<QHH6dII")
+_STATE = struct.Struct("<IddddIIBHBIQIIIIB")
+_PIPE = struct.Struct("<dHB")
+
+
+def _write_varint(out, value):
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _read_varint(data, offset):
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+def encode_state(state):
+    stats = state.stats
+    parts = [_STATE.pack(
+        state.tick, state.bird_y, state.bird_velocity, state.angle, state.pipe_speed,
+        state.score, state.combo, state.collisions, state.invincibility_ticks,
+        state.game_over, state.game_over_tick, state.rng.state,
+        stats['perfect_passes'], stats['near_misses'], stats['max_combo'], stats['total_coins'],
+        len(state.pipes)
+    )]
+    for pipe in state.pipes:
+        parts.append(_PIPE.pack(pipe.x, pipe.height, pipe.passed))
+    return b"".join(parts)
+
+
+def decode_state(data, offset, state):
+    # Overwrite a freshly constructed GameState with a keyframe; returns the
+    # offset just past it
+    (state.tick, state.bird_y, state.bird_velocity, state.angle, state.pipe_speed,
+     state.score, state.combo, state.collisions, state.invincibility_ticks,
+     game_over, state.game_over_tick, state.rng.state,
+     perfect, near, max_combo, coins, pipe_count) = _STATE.unpack_from(data, offset)
+    offset += _STATE.size
+    state.game_over = bool(game_over)
+    state.stats = {
+        'perfect_passes': perfect,
+        'near_misses': near,
+        'max_combo': max_combo,
+        'total_coins': coins
+    }
+    state.pipes.clear()
+    for _ in range(pipe_count):
+        x, height, passed = _PIPE.unpack_from(data, offset)
+        offset += _PIPE.size
+        state.pipes.spawn(x, height, state.pipe_gap).passed = bool(passed)
+    return offset
+
+
+class Replay:
+    def __init__(self, difficulty, seed, width, height, params, keyframe_interval=KEYFRAME_INTERVAL):
+        self.difficulty = difficulty
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.params = dict(params)
+        self.keyframe_interval = keyframe_interval
+        self.jump_ticks = []
+        self.keyframes = []  # (tick, encoded state)
+        self.total_ticks = 0
+        self.final_score = 0
+        self._jumps = None
+
+    def new_state(self):
+        return simulation.GameState(self.difficulty, self.seed, self.width, self.height, self.params)
+
+    def inputs_at(self, tick):
+        # Input bits for the step taken from `tick` to `tick + 1`
+        if self._jumps is None:
+            self._jumps = set(self.jump_ticks)
+        return simulation.INPUT_JUMP if tick in self._jumps else 0
+
+    def seek(self, tick):
+        # State at `tick`, restored from the nearest earlier keyframe
+        state = self.new_state()
+        index = bisect.bisect_right([frame_tick for frame_tick, _ in self.keyframes], tick) - 1
+        if index >= 0:
+            decode_state(self.keyframes[index][1], 0, state)
+        while state.tick < tick and not state.game_over:
+            simulation.step(state, self.inputs_at(state.tick))
+        return state
+
+    def play(self, state=None):
+        # Re-simulate headlessly at full speed to the end of the recording
+        state = state or self.new_state()
+        while state.tick < self.total_ticks and not state.game_over:
+            simulation.step(state, self.inputs_at(state.tick))
+        return state
+
+    def to_bytes(self):
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        difficulty = self.difficulty.encode()
+        out.append(len(difficulty))
+        out += difficulty
+        out += _HEADER.pack(self.seed, self.width, self.height,
+                            *(float(self.params[name]) for name in PARAM_NAMES),
+                            self.keyframe_interval, self.total_ticks)
+        out += struct.pack("<iI", self.final_score, len(self.jump_ticks))
+        previous = 0
+        for tick in self.jump_ticks:
+            _write_varint(out, tick - previous)
+            previous = tick
+        out += struct.pack("<I", len(self.keyframes))
+        for _, data in self.keyframes:
+            out += struct.pack("<I", len(data))
+            out += data
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:4] != MAGIC or data[4] != VERSION:
+            raise ValueError("Not a replay file or unsupported version")
+        length = data[5]
+        difficulty = data[6:6 + length].decode()
+        offset = 6 + length
+        seed, width, height, *values, interval, total_ticks = _HEADER.unpack_from(data, offset)
+        offset += _HEADER.size
+        params = dict(zip(PARAM_NAMES, values))
+        params["score_multiplier"] = int(params["score_multiplier"])
+        replay = cls(difficulty, seed, width, height, params, interval)
+        replay.total_ticks = total_ticks
+        replay.final_score, jump_count = struct.unpack_from("<iI", data, offset)
+        offset += 8
+        tick = 0
+        for _ in range(jump_count):
+            delta, offset = _read_varint(data, offset)
+            tick += delta
+            replay.jump_ticks.append(tick)
+        (keyframe_count,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        for _ in range(keyframe_count):
+            (size,) = struct.unpack_from("<I", data, offset)
+            offset += 4
+            frame = data[offset:offset + size]
+            (frame_tick,) = struct.unpack_from("<I", frame, 0)
+            replay.keyframes.append((frame_tick, frame))
+            offset += size
+        return replay
+
+    def save(self, path):
+        self.write(path, self.to_bytes())
+
+    @staticmethod
+    def write(path, data):
+        # Store bytes from to_bytes(), e.g. encoded earlier on another thread
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+class ReplayRecorder:
+    # Call record(state, inputs) right before every simulation.step
+    def __init__(self, state, keyframe_interval=KEYFRAME_INTERVAL):
+        params = {name: getattr(state, name) for name in PARAM_NAMES}
+        self.replay = Replay(state.difficulty, state.seed, state.width, state.height,
+                             params, keyframe_interval)
+
+    def record(self, state, inputs):
+        replay = self.replay
+        if state.tick % replay.keyframe_interval == 0:
+            replay.keyframes.append((state.tick, encode_state(state)))
+        if inputs & simulation.INPUT_JUMP:
+            replay.jump_ticks.append(state.tick)
+
+    def finish(self, state):
+        self.replay.total_ticks = state.tick
+        self.replay.final_score = state.score
+        return self.replay
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay playback")
+    parser.add_argument('path')
+    parser.add_argument('--seek', type=int, help="print the state at this tick")
+    parser.add_argument('--render', action="store_true", help="play back in the game window in real time")
+    args = parser.parse_args()
+
+    replay = Replay.load(args.path)
+    print(f"{replay.difficulty} seed={replay.seed} ticks={replay.total_ticks} "
+          f"jumps={len(replay.jump_ticks)} keyframes={len(replay.keyframes)} score={replay.final_score}")
+
+    if args.seek is not None:
+        state = replay.seek(args.seek)
+        print(f"tick {state.tick}: bird_y={state.bird_y:.2f} velocity={state.bird_velocity:.2f} "
+              f"score={state.score} pipes={len(state.pipes)}")
+
+    if args.render:
+        import main as game_main
+        game = game_main.Game()
+        game.replay = replay
+        game.state = "playing"
+        game.run()
+    else:
+        state = replay.play()
+        status = "OK" if state.score == replay.final_score else "MISMATCH"
+        print(f"Headless playback: score={state.score} ticks={state.tick} [{status}]")
+        sys.exit(0 if status == "OK" else 1)
+
+
+if __name__ == "__main__":
+    main()
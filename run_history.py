@@ -0,0 +1,261 @@
+"""
+Local run history for Modern Flappy Bird
+Every finished run is appended to an SQLite database. Inserts are queued and
+committed in batches by a background thread, so the frame loop never waits
+on disk. Leaderboard queries walk the (difficulty, score) index, and a
+per-difficulty summary table is kept current by a trigger, so the menu stays
+instant with hundreds of thousands of stored runs.
+
+Run: python run_history.py [--db run_history.db] [--populate N] [--difficulty normal]
+"""
+import argparse
+import atexit
+import os
+import random
+import threading
+import time
+
+try:
+    import sqlite3
+except ImportError:
+    # Some embedded Python builds ship without it; history is then disabled
+    sqlite3 = None
+
+DB_PATH = "run_history.db"
+BATCH_DELAY = 1.0  # seconds the writer waits for more runs before committing
+
+COLUMNS = ("played_at", "difficulty", "seed", "score", "ticks",
+           "perfect_passes", "near_misses", "max_combo", "total_coins")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    played_at REAL NOT NULL,
+    difficulty TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    ticks INTEGER NOT NULL,
+    perfect_passes INTEGER NOT NULL,
+    near_misses INTEGER NOT NULL,
+    max_combo INTEGER NOT NULL,
+    total_coins INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_difficulty_score ON runs (difficulty, score DESC);
+CREATE INDEX IF NOT EXISTS runs_score ON runs (score DESC);
+CREATE INDEX IF NOT EXISTS runs_played_at ON runs (played_at);
+
+CREATE TABLE IF NOT EXISTS difficulty_summary (
+    difficulty TEXT PRIMARY KEY,
+    runs INTEGER NOT NULL,
+    best INTEGER NOT NULL,
+    total_score INTEGER NOT NULL,
+    total_coins INTEGER NOT NULL,
+    last_played REAL NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS runs_summary AFTER INSERT ON runs BEGIN
+    INSERT INTO difficulty_summary
+    VALUES (NEW.difficulty, 1, NEW.score, NEW.score, NEW.total_coins, NEW.played_at)
+    ON CONFLICT (difficulty) DO UPDATE SET
+        runs = runs + 1,
+        best = MAX(best, NEW.score),
+        total_score = total_score + NEW.score,
+        total_coins = total_coins + NEW.total_coins,
+        last_played = MAX(last_played, NEW.played_at);
+END;
+"""
+
+_INSERT = f"INSERT INTO runs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+
+def _connect(path, check_same_thread=True):
+    connection = sqlite3.connect(path, timeout=5, check_same_thread=check_same_thread)
+    connection.row_factory = sqlite3.Row
+    # WAL lets the menu read while the writer commits; NORMAL sync is still
+    # crash-safe in WAL mode and skips an fsync per commit
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+class RunHistory:
+    # record() is safe to call from the frame loop: it only appends to a
+    # queue. With threaded=False (no threads, e.g. in the browser) it writes
+    # through instead. Queries run on the caller's own connection.
+    def __init__(self, path=DB_PATH, threaded=True):
+        self.path = path
+        self.threaded = threaded
+        self.batches = 0
+        self._pending = []
+        self._writing = False
+        self._condition = threading.Condition()
+        self._thread = None
+        self._writer = None
+        self._reader = None
+        if sqlite3 is not None:
+            try:
+                self._reader = _connect(path)
+            except sqlite3.DatabaseError:
+                # Unreadable file: keep it for inspection and start over
+                try:
+                    os.replace(path, path + '.corrupt')
+                    self._reader = _connect(path)
+                except (OSError, sqlite3.Error):
+                    self._reader = None
+        # Last-chance flush for exits that bypass Game.quit
+        atexit.register(self.flush)
+
+    @property
+    def available(self):
+        return self._reader is not None
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def record(self, difficulty, seed, score, ticks, stats, played_at=None):
+        if not self.available:
+            return
+        row = (played_at if played_at is not None else time.time(), difficulty, seed, score, ticks,
+               stats['perfect_passes'], stats['near_misses'], stats['max_combo'], stats['total_coins'])
+        with self._condition:
+            self._pending.append(row)
+            if self._thread is None and self.threaded:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+        if not self.threaded:
+            self.flush()
+
+    def flush(self):
+        # Commit everything queued so far, on the calling thread
+        with self._condition:
+            while self._writing:
+                self._condition.wait()
+            rows, self._pending = self._pending, []
+            self._writing = bool(rows)
+        if rows:
+            try:
+                self._write(rows)
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+
+    def _run(self):
+        condition = self._condition
+        while True:
+            with condition:
+                while not self._pending:
+                    condition.wait()
+            # Let a burst of runs gather into one transaction
+            time.sleep(BATCH_DELAY)
+            self.flush()
+
+    def _write(self, rows):
+        try:
+            if self._writer is None:
+                # Shared by the writer thread and flush(); _writing keeps
+                # them from using it at the same time
+                self._writer = _connect(self.path, check_same_thread=False)
+            with self._writer:
+                self._writer.executemany(_INSERT, rows)
+            self.batches += 1
+        except sqlite3.Error:
+            # The runs are lost, but the game carries on
+            pass
+
+    def _query(self, sql, parameters=()):
+        if not self.available:
+            return []
+        try:
+            return self._reader.execute(sql, parameters).fetchall()
+        except sqlite3.Error:
+            return []
+
+    def top(self, difficulty=None, limit=10):
+        # Best runs, highest score first, overall or for one difficulty
+        if difficulty is None:
+            return self._query("SELECT * FROM runs ORDER BY score DESC LIMIT ?", (limit,))
+        return self._query("SELECT * FROM runs WHERE difficulty = ? ORDER BY score DESC LIMIT ?",
+                           (difficulty, limit))
+
+    def recent(self, limit=10):
+        return self._query("SELECT * FROM runs ORDER BY played_at DESC LIMIT ?", (limit,))
+
+    def summary(self, difficulty=None):
+        # Per-difficulty totals: runs, best, total_score, total_coins, last_played
+        if difficulty is None:
+            return self._query("SELECT * FROM difficulty_summary ORDER BY difficulty")
+        rows = self._query("SELECT * FROM difficulty_summary WHERE difficulty = ?", (difficulty,))
+        return rows[0] if rows else None
+
+    def percentile_rank(self, difficulty, score):
+        # Share of runs on this difficulty that scored below `score`, 0-100
+        summary = self.summary(difficulty)
+        if summary is None:
+            return 0.0
+        rows = self._query("SELECT COUNT(*) FROM runs WHERE difficulty = ? AND score < ?",
+                           (difficulty, score))
+        return 100.0 * rows[0][0] / summary['runs'] if rows else 0.0
+
+    def score_at_percentile(self, difficulty, percentile):
+        # Score at `percentile` of this difficulty's runs (50 is the median)
+        summary = self.summary(difficulty)
+        if summary is None:
+            return 0
+        offset = min(summary['runs'] - 1, int(summary['runs'] * (100 - percentile) / 100))
+        rows = self._query("SELECT score FROM runs WHERE difficulty = ? ORDER BY score DESC "
+                           "LIMIT 1 OFFSET ?", (difficulty, offset))
+        return rows[0][0] if rows else 0
+
+    def close(self):
+        self.flush()
+        for connection in (self._reader, self._writer):
+            if connection is not None:
+                connection.close()
+        self._reader = self._writer = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run history queries")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--populate', type=int, default=0, help="insert N synthetic runs first")
+    parser.add_argument('--difficulty', default="normal")
+    args = parser.parse_args()
+
+    history = RunHistory(args.db, threaded=False)
+    if not history.available:
+        parser.exit(1, "sqlite3 is not available\n")
+    if args.populate:
+        rng = random.Random(args.populate)
+        now = time.time()
+        rows = []
+        for i in range(args.populate):
+            score = int(rng.expovariate(1 / 30))
+            rows.append((now - i * 60, rng.choice(("easy", "normal", "hardcore")), rng.getrandbits(32),
+                         score, score * 90 + rng.randrange(300), score // 10, score // 5,
+                         rng.randrange(score // 4 + 1), score // 2))
+        start = time.perf_counter()
+        history._write(rows)
+        print(f"Inserted {len(rows)} runs in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def timed(label, func, *func_args):
+        start = time.perf_counter()
+        result = func(*func_args)
+        print(f"{label:<28} {(time.perf_counter() - start) * 1000:7.2f} ms")
+        return result
+
+    summary = timed("summary", history.summary, args.difficulty)
+    top = timed("top 10", history.top, args.difficulty)
+    median = timed("median", history.score_at_percentile, args.difficulty, 50)
+    p90 = timed("90th percentile", history.score_at_percentile, args.difficulty, 90)
+    if summary is not None:
+        print(f"{args.difficulty}: {summary['runs']} runs, best {summary['best']}, "
+              f"mean {summary['total_score'] / summary['runs']:.1f}, median {median}, p90 {p90}")
+        print("top:", ", ".join(str(row['score']) for row in top))
+    history.close()
+
+
+if __name__ == "__main__":
+    main()
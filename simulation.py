@@ -0,0 +1,291 @@
+"""
+Headless gameplay simulation for Modern Flappy Bird
+Pure Python, deterministic and tick based - no pygame or display required
+"""
+from collections import deque
+
+# Difficulty Settings
+DIFFICULTY_SETTINGS = {
+    "easy": {
+        "gravity": 0.35,
+        "jump_strength": -7,
+        "initial_speed": 2.5,
+        "speed_increment": 0.3,
+        "pipe_gap": 220,
+        "score_multiplier": 1
+    },
+    "normal": {
+        "gravity": 0.5,
+        "jump_strength": -8,
+        "initial_speed": 3.5,
+        "speed_increment": 0.5,
+        "pipe_gap": 200,
+        "score_multiplier": 2
+    },
+    "hardcore": {
+        "gravity": 0.65,
+        "jump_strength": -9,
+        "initial_speed": 4.5,
+        "speed_increment": 0.7,
+        "pipe_gap": 180,
+        "score_multiplier": 3
+    }
+}
+
+# Gameplay geometry (bird hitbox is a 30x30 rect at x=85)
+BIRD_X = 85
+BIRD_SIZE = 30
+PIPE_WIDTH = 70
+PIPE_SPACING = 300
+PIPE_MARGIN = 100
+MAX_COLLISIONS = 1
+INVINCIBILITY_TICKS = 60  # 1 second at 60 ticks per second
+TICK_RATE = 60
+
+# Input bits accepted by step()
+INPUT_JUMP = 1
+
+# Events reported by step() as (name, value) tuples
+EVENT_JUMP = "jump"
+EVENT_HIT = "hit"              # value: True if the hit ended the game
+EVENT_CRASH = "crash"          # bird left the screen
+EVENT_SCORE = "score"          # value: coins awarded for the pass
+EVENT_PERFECT = "perfect"
+EVENT_NEAR_MISS = "near_miss"
+EVENT_SPEED_UP = "speed_up"
+
+MASK64 = (1 << 64) - 1
+
+
+class SplitMix64:
+    # Tiny PRNG whose whole state is one integer, so it can be snapshotted,
+    # replayed and reproduced exactly by the vectorized simulators
+    def __init__(self, seed=0):
+        self.state = seed & MASK64
+
+    def next(self):
+        self.state = (self.state + 0x9E3779B97F4A7C15) & MASK64
+        z = self.state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        return z ^ (z >> 31)
+
+    def randrange(self, low, high):
+        return low + self.next() % (high - low)
+
+
+class Pipe:
+    # Collision bounds never change after spawning, so they are computed once
+    __slots__ = ("x", "height", "gap_top", "gap_bottom", "passed")
+
+    def reset(self, x, height, gap):
+        self.x = x
+        self.height = height
+        self.gap_top = int(height)
+        self.gap_bottom = self.gap_top + gap
+        self.passed = False
+        return self
+
+
+class Obstacles:
+    # Live pipes in spawn order, which is also left-to-right order. Pipes
+    # leave from the front, so culling is a popleft and culled pipes go to
+    # a free list for the next spawn instead of being reallocated.
+    def __init__(self):
+        self.pipes = deque()
+        self._pool = []
+
+    def __len__(self):
+        return len(self.pipes)
+
+    def __iter__(self):
+        return iter(self.pipes)
+
+    def __getitem__(self, index):
+        return self.pipes[index]
+
+    def spawn(self, x, height, gap):
+        pipe = self._pool.pop() if self._pool else Pipe()
+        self.pipes.append(pipe.reset(x, height, gap))
+        return pipe
+
+    def scroll(self, speed):
+        for pipe in self.pipes:
+            pipe.x -= speed
+
+    def cull(self, left):
+        # Recycle pipes at or past x == left
+        pipes = self.pipes
+        while pipes and pipes[0].x <= left:
+            self._pool.append(pipes.popleft())
+
+    def clear(self):
+        self._pool.extend(self.pipes)
+        self.pipes.clear()
+
+
+class GameState:
+    def __init__(self, difficulty="normal", seed=0, width=1280, height=720, params=None):
+        settings = dict(DIFFICULTY_SETTINGS[difficulty])
+        if params:
+            settings.update(params)
+
+        self.difficulty = difficulty
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.gravity = settings["gravity"]
+        self.jump_strength = settings["jump_strength"]
+        self.initial_speed = settings["initial_speed"]
+        self.speed_increment = settings["speed_increment"]
+        self.pipe_gap = settings["pipe_gap"]
+        self.score_multiplier = settings["score_multiplier"]
+        self.rng = SplitMix64(seed)
+
+        self.tick = 0
+        self.bird_y = height // 2
+        self.bird_velocity = 0
+        self.angle = 0
+        self.pipe_speed = self.initial_speed
+        self.score = 0
+        self.combo = 0
+        self.collisions = 0
+        self.invincibility_ticks = 0
+        self.game_over = False
+        self.game_over_tick = 0
+        self.stats = {
+            'perfect_passes': 0,
+            'near_misses': 0,
+            'max_combo': 0,
+            'total_coins': 0
+        }
+        self.events = []
+        self.pipes = Obstacles()
+        create_pipe(self, width)
+
+
+def create_pipe(state, x_pos):
+    height = state.rng.randrange(PIPE_MARGIN, int(state.height - state.pipe_gap - PIPE_MARGIN))
+    return state.pipes.spawn(x_pos, height, state.pipe_gap)
+
+
+def step(state, inputs=0):
+    # Advance the game by one tick and return the events it produced.
+    # The returned list is reused between calls.
+    events = state.events
+    events.clear()
+    if state.game_over:
+        return events
+
+    state.tick += 1
+    if inputs & INPUT_JUMP:
+        state.bird_velocity = state.jump_strength
+        events.append((EVENT_JUMP, None))
+
+    # Update bird position and angle
+    state.bird_velocity += state.gravity
+    state.bird_y += state.bird_velocity
+    state.angle = max(-45, min(45, state.bird_velocity * 3))
+
+    # Scroll, cull and spawn pipes
+    pipes = state.pipes
+    pipes.scroll(state.pipe_speed)
+    pipes.cull(-PIPE_WIDTH)
+    if not pipes or pipes[-1].x < state.width - PIPE_SPACING:
+        create_pipe(state, state.width)
+
+    # Check collisions and score (same truncation as pygame.Rect). Pipes are
+    # sorted by x, so the broadphase skips passed pipes behind the bird and
+    # stops at the first pipe that starts past its right edge.
+    bird_top = int(state.bird_y)
+    bird_bottom = bird_top + BIRD_SIZE
+    for pipe in pipes:
+        pipe_left = int(pipe.x)
+        if pipe_left >= BIRD_X + BIRD_SIZE:
+            break
+        if pipe_left + PIPE_WIDTH <= BIRD_X:
+            if pipe.passed:
+                continue
+        else:
+            hit = (bird_bottom > 0 and bird_top < pipe.gap_top) or bird_bottom > pipe.gap_bottom
+            if hit and state.invincibility_ticks <= 0:
+                state.collisions += 1
+                if state.collisions >= MAX_COLLISIONS:
+                    _end_game(state)
+                state.invincibility_ticks = INVINCIBILITY_TICKS
+                events.append((EVENT_HIT, state.game_over))
+
+        # Score point if passing pipe
+        if not pipe.passed and pipe.x < BIRD_X:
+            pipe.passed = True
+            _score_pipe(state, pipe)
+
+    # Check if bird hits boundaries
+    if state.bird_y < 0 or state.bird_y > state.height:
+        _end_game(state)
+        events.append((EVENT_CRASH, None))
+
+    if state.invincibility_ticks > 0:
+        state.invincibility_ticks -= 1
+    return events
+
+
+def _end_game(state):
+    if not state.game_over:
+        state.game_over = True
+        state.game_over_tick = state.tick
+
+
+def _score_pipe(state, pipe):
+    multiplier = state.score_multiplier
+    stats = state.stats
+    events = state.events
+    state.score += 1 * multiplier
+
+    # Calculate center-line deviation for perfect pass bonus
+    pipe_center = pipe.height + state.pipe_gap / 2
+    bird_center = state.bird_y + BIRD_SIZE / 2
+    deviation = abs(bird_center - pipe_center)
+
+    # Perfect pass bonus (within 10 pixels of center)
+    if deviation < 10:
+        state.score += 2 * multiplier
+        state.combo += 1
+        stats['perfect_passes'] += 1
+        events.append((EVENT_PERFECT, None))
+    # Near miss bonus (within 30 pixels of center)
+    elif deviation < 30:
+        state.score += 1 * multiplier
+        state.combo += 1
+        stats['near_misses'] += 1
+        events.append((EVENT_NEAR_MISS, None))
+    else:
+        state.combo = 0
+
+    stats['max_combo'] = max(stats['max_combo'], state.combo)
+
+    # Award coins based on performance
+    coin_bonus = (1 + (state.combo // 3)) * multiplier
+    stats['total_coins'] += coin_bonus
+    events.append((EVENT_SCORE, coin_bonus))
+
+    # Speed increase every 10 points
+    if state.score % 10 == 0:
+        state.pipe_speed += state.speed_increment
+        events.append((EVENT_SPEED_UP, None))
+
+
+def run(state, policy, max_ticks=None):
+    # Drive a state to game over with policy(state) -> input bits
+    while not state.game_over and (max_ticks is None or state.tick < max_ticks):
+        step(state, policy(state))
+    return state
+
+
+def gap_policy(state):
+    # Scripted bot: flap when falling below the centre of the next gap
+    for pipe in state.pipes:
+        if pipe.x + PIPE_WIDTH > BIRD_X:
+            target = pipe.height + state.pipe_gap / 2 - 5
+            return INPUT_JUMP if state.bird_y > target and state.bird_velocity > 0 else 0
+    return 0
@@ -0,0 +1,134 @@
+"""
+Procedural sound effects for Modern Flappy Bird
+Every effect is a small recipe of decaying sine partials rendered to 16-bit
+PCM at the mixer's frequency and channel count (the mixer is assumed to use
+signed 16-bit samples). Rendered PCM is cached on disk under a hash of the
+recipe and the mixer format, so later launches load bytes instead of
+synthesizing.
+"""
+import hashlib
+import json
+import math
+import os
+from array import array
+
+import accel
+
+SAMPLE_RATE = 44100
+CACHE_DIR = "sound_cache"
+
+# duration in seconds, gain is the int16 scale, drive is pre-clip
+# amplification (None for no clipping), partials are
+# (start Hz, end Hz, harmonic, amplitude, decay per second)
+RECIPES = {
+    # Fun 8-bit style jump: rising sweep with two harmonics
+    "jump": {
+        "duration": 0.1, "gain": 16383, "drive": None,
+        "partials": [(800, 1200, 1, 1.0, 10), (800, 1200, 2, 0.5, 10), (800, 1200, 4, 0.25, 10)]
+    },
+    # Coin collect: two sweeps plus a fast-decaying sparkle
+    "point": {
+        "duration": 0.1, "gain": 16383, "drive": None,
+        "partials": [(600, 1000, 1, 1.0, 15), (900, 1500, 1, 1.0, 15), (2000, 2000, 1, 0.3, 30)]
+    },
+    # Dramatic failure: falling sweep over a low impact, distorted
+    "death": {
+        "duration": 0.3, "gain": 16383, "drive": 1.3,
+        "partials": [(400, 200, 1, 1.0, 3), (100, 100, 1, 1.0, 20)]
+    },
+    # Soft UI click
+    "ui_click": {
+        "duration": 0.05, "gain": 8191, "drive": None,
+        "partials": [(800, 800, 1, 1.0, 50)]
+    }
+}
+
+
+def synthesize(recipe, frequency=SAMPLE_RATE, channels=1):
+    # Interleaved int16 PCM, the same signal on every channel
+    np = accel.numpy()
+    if np is None:
+        return _synthesize_python(recipe, frequency, channels)
+    duration = recipe["duration"]
+    t = np.linspace(0, duration, int(frequency * duration))
+    wave = np.zeros_like(t)
+    for start, end, harmonic, amplitude, decay in recipe["partials"]:
+        freq = np.interp(t, [0, duration], [start, end])
+        wave += amplitude * np.sin(2 * np.pi * harmonic * freq * t) * np.exp(-t * decay)
+    if recipe["drive"] is not None:
+        wave = np.clip(wave * recipe["drive"], -1, 1)
+    samples = np.int16(wave * recipe["gain"])
+    if channels > 1:
+        samples = np.repeat(samples, channels)
+    return samples.tobytes()
+
+
+def _synthesize_python(recipe, frequency=SAMPLE_RATE, channels=1):
+    # Sample-by-sample twin of synthesize() for builds without NumPy
+    duration = recipe["duration"]
+    partials = recipe["partials"]
+    drive = recipe["drive"]
+    gain = recipe["gain"]
+    count = int(frequency * duration)
+    step = duration / (count - 1)
+    samples = array('h', bytes(2 * count * channels))
+    for i in range(count):
+        t = duration if i == count - 1 else i * step
+        value = 0.0
+        for start, end, harmonic, amplitude, decay in partials:
+            freq = start + (end - start) * t / duration
+            value += amplitude * math.sin(2 * math.pi * harmonic * freq * t) * math.exp(-t * decay)
+        if drive is not None:
+            value = max(-1.0, min(1.0, value * drive))
+        # Wrap like NumPy's int16 cast, which louder recipes rely on
+        sample = (int(value * gain) + 32768) % 65536 - 32768
+        for channel in range(channels):
+            samples[i * channels + channel] = sample
+    return samples.tobytes()
+
+
+def cache_key(name, mixer_format):
+    # mixer_format decides the rendered rate and channels, so it is all the
+    # key needs besides the recipe
+    blob = json.dumps([name, RECIPES[name], list(mixer_format)], sort_keys=True)
+    return hashlib.sha1(blob.encode()).hexdigest()[:16]
+
+
+class SoundCache:
+    # Raw PCM per effect in `directory`; mixer_format is pygame.mixer.get_init()
+    def __init__(self, mixer_format, directory=CACHE_DIR):
+        self.mixer_format = tuple(mixer_format or ())
+        self.directory = directory
+        # (frequency, size, channels); mono at SAMPLE_RATE without a mixer
+        if self.mixer_format:
+            self.frequency, _, self.channels = self.mixer_format
+        else:
+            self.frequency, self.channels = SAMPLE_RATE, 1
+
+    def path(self, name):
+        return os.path.join(self.directory, f"{name}-{cache_key(name, self.mixer_format)}.pcm")
+
+    def load(self, name):
+        try:
+            with open(self.path(name), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def render(self, name):
+        # Synthesize and store; a failed write only costs the next launch
+        data = synthesize(RECIPES[name], self.frequency, self.channels)
+        path = self.path(name)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for entry in os.listdir(self.directory):
+                # Drop entries left by older recipes or mixer formats
+                if entry.startswith(f"{name}-") and entry != os.path.basename(path):
+                    os.remove(os.path.join(self.directory, entry))
+            temp_path = f"{path}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            pass
+        return data
@@ -0,0 +1,24 @@
+import threading
+
+from main import FileWriter
+
+
+def test_failing_job_does_not_stop_the_writer():
+    writer = FileWriter()
+    done = []
+
+    def fail():
+        raise RuntimeError("boom")
+
+    writer.submit(fail)
+    writer.submit(done.append, "after")
+
+    finished = threading.Event()
+    threading.Thread(target=lambda: (writer.flush(), finished.set()), daemon=True).start()
+    assert finished.wait(5), "flush() did not return"
+    assert done == ["after"]
+
+    # The writer thread is still alive for later jobs
+    writer.submit(done.append, "later")
+    writer.flush()
+    assert done == ["after", "later"]
@@ -0,0 +1,26 @@
+import simulation
+from ghost import GhostRecorder, GhostTrack
+
+
+def record_run(width, height):
+    state = simulation.GameState("normal", seed=3, width=width, height=height)
+    recorder = GhostRecorder(state)
+    while not state.game_over and state.tick < 500:
+        simulation.step(state, simulation.gap_policy(state))
+        recorder.record(state)
+    return state, recorder
+
+
+def test_ghost_is_only_raced_at_its_screen_size(tmp_path):
+    state, recorder = record_run(1280, 720)
+    recorder.save(state.score, tmp_path)
+
+    track = GhostTrack.open("normal", (1280, 720), tmp_path)
+    assert track is not None
+    assert (track.seed, track.ticks, track.size) == (3, state.tick, (1280, 720))
+    assert track.pose(state.tick)[0] == round(state.bird_y * 4) / 4
+    track.close()
+
+    assert GhostTrack.open("normal", (800, 600), tmp_path) is None
+    assert GhostTrack.best_score("normal", (1280, 720), tmp_path) == state.score
+    assert GhostTrack.best_score("normal", (800, 600), tmp_path) is None
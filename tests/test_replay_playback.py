@@ -0,0 +1,51 @@
+import asyncio
+
+import pygame
+
+import main
+import simulation
+from replay import ReplayRecorder
+
+
+def test_truncated_replay_ends_instead_of_crashing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    game = main.Game()
+
+    # A run the player quit mid-flight: the bot never crashes in 150 ticks
+    state = simulation.GameState(game.settings.difficulty, seed=11,
+                                 width=main.SCREEN_WIDTH, height=main.SCREEN_HEIGHT)
+    recorder = ReplayRecorder(state)
+    for _ in range(150):
+        inputs = simulation.gap_policy(state)
+        recorder.record(state, inputs)
+        simulation.step(state, inputs)
+    assert not state.game_over
+    replay = recorder.finish(state)
+
+    events = []
+    handle_sim_event = game.handle_sim_event
+    monkeypatch.setattr(game, "handle_sim_event",
+                        lambda state, event, value: (events.append(event),
+                                                     handle_sim_event(state, event, value)))
+    frames = []
+    get_events = pygame.event.get
+
+    def fake_events():
+        frames.append(None)
+        queued = get_events()
+        if len(frames) > 5000:
+            # Safety net so a regression fails instead of hanging
+            queued.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_ESCAPE))
+        return queued
+    monkeypatch.setattr(pygame.event, "get", fake_events)
+
+    game.replay = replay
+    game.state = "playing"
+    asyncio.run(game.play_game())
+
+    assert len(frames) <= 5000
+    assert game.state == "menu"
+    assert simulation.EVENT_HIT not in events and simulation.EVENT_CRASH not in events
+    game.file_writer.flush()
+    game.settings.flush()
+    game.run_history.close()
@@ -0,0 +1,183 @@
+"""
+Monte Carlo difficulty tuner for DIFFICULTY_SETTINGS
+Sweeps parameter grids around each preset, plays thousands of headless games
+per configuration with scripted or randomized bots across all CPU cores, and
+reports score distributions, pipes-survived histograms and coins per minute.
+
+Run: python tune_difficulty.py --policy noisy --games 20000 \
+         --grid gravity=0.45,0.5,0.55 --grid pipe_gap=180,200 --out sweep.jsonl
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from batch_sim import BatchSimulator, POLICIES
+from simulation import DIFFICULTY_SETTINGS, TICK_RATE
+
+# Pipes-survived histogram bucket edges (last bucket is open ended)
+PIPE_BUCKETS = [0, 1, 2, 5, 10, 20, 50, 100, 200, 500]
+SCORE_PERCENTILES = [10, 25, 50, 75, 90, 99]
+# Parameters that feed the integer score and coin totals
+INTEGER_PARAMS = {"score_multiplier"}
+
+
+def parse_grid(specs):
+    # ["gravity=0.4,0.5", "pipe_gap=180,200"] -> {"gravity": [0.4, 0.5], ...}
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name not in DIFFICULTY_SETTINGS["normal"]:
+            raise ValueError(f"Unknown difficulty parameter: {name}")
+        kind = int if name in INTEGER_PARAMS else float
+        grid[name] = [kind(value) for value in values.split(",") if value]
+    return grid
+
+
+def build_configs(presets, grid):
+    configs = []
+    names = sorted(grid)
+    for preset in presets:
+        for values in itertools.product(*(grid[name] for name in names)):
+            params = dict(DIFFICULTY_SETTINGS[preset])
+            params.update(zip(names, values))
+            configs.append({'preset': preset, 'params': params})
+    return configs
+
+
+def run_job(job):
+    # Worker entry point: play one chunk of games for one configuration
+    sim = BatchSimulator(
+        job['games'],
+        job['preset'],
+        seeds=np.arange(job['seed'], job['seed'] + job['games']),
+        params=job['params']
+    )
+    sim.run(POLICIES[job['policy']](job['seed']), job['max_ticks'])
+    return job, {
+        'score': sim.score,
+        'pipes': sim.pipes_passed,
+        'coins': sim.coins,
+        'ticks': sim.ticks,
+        'max_combo': sim.max_combo
+    }
+
+
+def summarize(config, chunks):
+    score = np.concatenate([chunk['score'] for chunk in chunks])
+    pipes = np.concatenate([chunk['pipes'] for chunk in chunks])
+    coins = np.concatenate([chunk['coins'] for chunk in chunks])
+    ticks = np.concatenate([chunk['ticks'] for chunk in chunks])
+    max_combo = np.concatenate([chunk['max_combo'] for chunk in chunks])
+
+    edges = PIPE_BUCKETS + [max(int(pipes.max()) + 1, PIPE_BUCKETS[-1] + 1)]
+    counts, _ = np.histogram(pipes, bins=edges)
+    labels = [f"{low}-{high - 1}" if high - low > 1 else str(low) for low, high in zip(edges, edges[1:])]
+    labels[-1] = f"{PIPE_BUCKETS[-1]}+"
+    minutes = ticks.sum() / TICK_RATE / 60
+
+    return {
+        'type': "summary",
+        'preset': config['preset'],
+        'params': config['params'],
+        'games': int(score.size),
+        'score_mean': float(score.mean()),
+        'score_percentiles': {str(p): float(v) for p, v in
+                              zip(SCORE_PERCENTILES, np.percentile(score, SCORE_PERCENTILES))},
+        'pipes_histogram': dict(zip(labels, counts.tolist())),
+        'survival': {str(n): float((pipes >= n).mean()) for n in (10, 25, 50, 100)},
+        'coins_per_minute': float(coins.sum() / minutes) if minutes else 0.0,
+        'mean_seconds_alive': float(ticks.mean() / TICK_RATE),
+        'mean_max_combo': float(max_combo.mean())
+    }
+
+
+def format_summary(summary):
+    # Every parameter, so configurations that differ only in a swept key
+    # such as score_multiplier stay distinguishable
+    params = " ".join(f"{name}={value}" for name, value in summary['params'].items())
+    percentiles = summary['score_percentiles']
+    return (f"[{summary['preset']}] {params}: "
+            f"score p50={percentiles['50']:.0f} p90={percentiles['90']:.0f} "
+            f"mean={summary['score_mean']:.1f}, "
+            f"survive 10/50 pipes={summary['survival']['10']:.0%}/{summary['survival']['50']:.0%}, "
+            f"{summary['coins_per_minute']:.1f} coins/min")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo difficulty tuner")
+    parser.add_argument('--presets', nargs="+", choices=sorted(DIFFICULTY_SETTINGS),
+                        default=["easy", "normal", "hardcore"])
+    parser.add_argument('--grid', action="append", default=[], metavar="PARAM=V1,V2,...",
+                        help="sweep a DIFFICULTY_SETTINGS parameter (repeatable)")
+    parser.add_argument('--policy', choices=sorted(POLICIES), default="noisy")
+    parser.add_argument('--games', type=int, default=5000, help="games per configuration")
+    parser.add_argument('--chunk', type=int, default=1000, help="games per worker job")
+    parser.add_argument('--max-ticks', type=int, default=TICK_RATE * 60 * 5,
+                        help="cap per game (default: 5 minutes of play)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--out', help="stream JSON lines to this file")
+    args = parser.parse_args()
+
+    configs = build_configs(args.presets, parse_grid(args.grid))
+    jobs = []
+    for index, config in enumerate(configs):
+        for seed in range(0, args.games, args.chunk):
+            jobs.append({
+                'config': index,
+                'preset': config['preset'],
+                'params': config['params'],
+                'policy': args.policy,
+                'games': min(args.chunk, args.games - seed),
+                'seed': seed,
+                'max_ticks': args.max_ticks
+            })
+
+    print(f"{len(configs)} configurations, {len(jobs)} jobs on {args.workers} workers", file=sys.stderr)
+    out = open(args.out, "w") if args.out else None
+    pending = {index: [] for index in range(len(configs))}
+    remaining = {index: 0 for index in range(len(configs))}
+    for job in jobs:
+        remaining[job['config']] += 1
+
+    start = time.perf_counter()
+    done = 0
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = [pool.submit(run_job, job) for job in jobs]
+            # Stream results as they finish; summarize a configuration as soon
+            # as its last chunk arrives
+            for future in as_completed(futures):
+                job, chunk = future.result()
+                done += 1
+                index = job['config']
+                pending[index].append(chunk)
+                remaining[index] -= 1
+                if out:
+                    out.write(json.dumps({
+                        'type': "chunk", 'preset': job['preset'], 'params': job['params'],
+                        'seed': job['seed'], 'games': job['games'],
+                        'score_mean': float(chunk['score'].mean()),
+                        'bird_ticks': int(chunk['ticks'].sum())
+                    }) + "\n")
+                if remaining[index] == 0:
+                    summary = summarize(configs[index], pending.pop(index))
+                    print(format_summary(summary))
+                    if out:
+                        out.write(json.dumps(summary) + "\n")
+                        out.flush()
+                print(f"\r{done}/{len(jobs)} jobs, {time.perf_counter() - start:.1f}s",
+                      end="", file=sys.stderr)
+    finally:
+        if out:
+            out.close()
+    print(file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()